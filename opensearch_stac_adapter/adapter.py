@@ -1,18 +1,26 @@
+import asyncio
 import attr
+import hashlib
+import logging
+import time
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
-from typing import Optional, List, Union, Dict, Type
+from typing import Optional, List, Union, Dict, Type, AsyncIterator, Callable, Any, Tuple
 from collections import OrderedDict
+from functools import partial
 
 from pydantic import ValidationError
+import requests
 from starlette.requests import Request
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
 from jsonpath_ng import jsonpath, parse
 import json
 from shapely.geometry import shape
 
 from stac_pydantic.links import Relations
 from stac_pydantic.shared import MimeTypes, Asset, AssetRoles, Provider
-from stac_fastapi.types.core import AsyncBaseCoreClient, NumType
+from stac_fastapi.types.core import AsyncBaseCoreClient, AsyncBaseFiltersClient, NumType
 from stac_fastapi.types.stac import Collection, Collections, Item, ItemCollection
 from stac_fastapi.types.links import CollectionLinks
 from stac_fastapi.types.errors import NotFoundError, InvalidQueryParameter
@@ -25,6 +33,14 @@ import terracatalogueclient.exceptions
 from opensearch_stac_adapter import __title__, __version__
 from opensearch_stac_adapter.models.links import PagingLinks, ItemLinks
 from opensearch_stac_adapter.models.search import AdaptedSearch
+from opensearch_stac_adapter.models.paging import PagingToken
+from opensearch_stac_adapter.sort import sort_keys, parse_sortby_param
+from opensearch_stac_adapter.query import translate_query
+from opensearch_stac_adapter.cql2 import parse_filter, split_filter, compile_filter
+from opensearch_stac_adapter.export import ExportFormat, get_item_writer
+from opensearch_stac_adapter.federation import BackendUnavailableError, FederatedCatalogue
+from opensearch_stac_adapter.planning import extent_intersects
+from opensearch_stac_adapter.buffer import ProductBuffer
 
 
 path_beginning_datetime: jsonpath.JSONPath = parse(
@@ -36,10 +52,27 @@ path_ending_datetime: jsonpath.JSONPath = parse(
 path_platform_shortname: jsonpath.JSONPath = parse(
     "$.acquisitionInformation[*].platform.platformShortName"
 )
+path_orbit_direction: jsonpath.JSONPath = parse(
+    "$.acquisitionInformation[*].acquisitionParameters.orbitDirection"
+)
+path_relative_orbit_number: jsonpath.JSONPath = parse(
+    "$.acquisitionInformation[*].acquisitionParameters.relativeOrbitNumber"
+)
+path_tile_id: jsonpath.JSONPath = parse(
+    "$.acquisitionInformation[*].acquisitionParameters.tileId"
+)
+path_cloud_cover: jsonpath.JSONPath = parse(
+    "$.productInformation.cloudCover"
+)
+path_product_type: jsonpath.JSONPath = parse(
+    "$.productInformation.productType"
+)
 path_resource_links: jsonpath.JSONPath = parse(
     "$.links.*[*]"
 )
 
+logger = logging.getLogger(__name__)
+
 terracatalogueclient.client._DEFAULT_REQUEST_HEADERS = {
     "User-Agent": f"{__title__}/{__version__} with {terracatalogueclient.__title__}/{terracatalogueclient.__version__}"
 }
@@ -49,8 +82,39 @@ terracatalogueclient.client._DEFAULT_REQUEST_HEADERS = {
 class OpenSearchAdapterClient(AsyncBaseCoreClient):
     """STAC API client that implements a OpenSeach endpoint as back-end."""
 
-    catalogue: Catalogue = attr.ib(default=Catalogue())  # OpenSearch catalogue
+    catalogue: Union[Catalogue, FederatedCatalogue] = attr.ib(default=Catalogue())  # OpenSearch catalogue(s)
     search_request_model: Type[AdaptedSearch] = attr.ib(init=False, default=AdaptedSearch)
+    max_concurrent_requests: int = attr.ib(default=8)  # maximum number of concurrent catalogue requests
+    backend_page_size: int = attr.ib(default=1000)  # maximum number of products per catalogue request
+    max_filter_scan: int = attr.ib(default=10000)  # maximum number of products evaluated by a residual filter per page
+    collection_cache_ttl: float = attr.ib(default=300)  # seconds the collection extents are cached for search planning
+    product_buffer: ProductBuffer = attr.ib()  # products fetched ahead of the search pages
+    _extent_cache: Optional[Tuple[float, Dict[str, dict]]] = attr.ib(init=False, default=None)
+
+    @product_buffer.default
+    def _default_product_buffer(self) -> ProductBuffer:
+        return ProductBuffer(max_page_size=self.backend_page_size, max_concurrent_requests=self.max_concurrent_requests)
+
+    @staticmethod
+    def _collection_extent(c: terracatalogueclient.Collection) -> dict:
+        """
+        Get the STAC extent of an OpenSearch collection.
+
+        :param c: OpenSearch collection
+        :return: STAC extent
+        """
+        date_split = c.properties['date'].split("/")
+        date_start = date_split[0]
+        date_end = date_split[1] if len(date_split) == 2 and len(date_split[1]) > 0 else None
+
+        return {
+            "spatial": {
+                "bbox": [c.bbox]
+            },
+            "temporal": {
+                "interval": [[date_start, date_end]]
+            }
+        }
 
     @staticmethod
     async def _collection_adapter(c: terracatalogueclient.Collection, base_url: str) -> Collection:
@@ -61,9 +125,8 @@ class OpenSearchAdapterClient(AsyncBaseCoreClient):
         :param base_url: base URL of the request
         :return: STAC collection
         """
-        date_split = c.properties['date'].split("/")
-        date_start = date_split[0]
-        date_end = date_split[1] if len(date_split) == 2 and len(date_split[1]) > 0 else None
+        extent = OpenSearchAdapterClient._collection_extent(c)
+        date_start, date_end = extent["temporal"]["interval"][0]
 
         return Collection(
             type="Collection",
@@ -75,14 +138,7 @@ class OpenSearchAdapterClient(AsyncBaseCoreClient):
             license=c.properties['rights'],
             keywords=c.properties['keyword'],
             # providers
-            extent={
-                "spatial": {
-                    "bbox": [c.bbox]
-                },
-                "temporal": {
-                    "interval": [[date_start, date_end]]
-                }
-            },
+            extent=extent,
             summaries={
                 "datetime": {
                     "min": date_start,
@@ -163,6 +219,16 @@ class OpenSearchAdapterClient(AsyncBaseCoreClient):
 
         if len(platforms := path_platform_shortname.find(p.properties)):
             properties['platform'] = platforms[0].value
+        if len(cloud_covers := path_cloud_cover.find(p.properties)):
+            properties['eo:cloud_cover'] = cloud_covers[0].value
+        if len(orbit_directions := path_orbit_direction.find(p.properties)):
+            properties['sat:orbit_state'] = str(orbit_directions[0].value).lower()
+        if len(relative_orbits := path_relative_orbit_number.find(p.properties)):
+            properties['sat:relative_orbit'] = relative_orbits[0].value
+        if len(product_types := path_product_type.find(p.properties)):
+            properties['product:type'] = product_types[0].value
+        if len(tile_ids := path_tile_id.find(p.properties)):
+            properties['grid:code'] = f"MGRS-{tile_ids[0].value}"
 
         return Item(
             type="Feature",
@@ -208,7 +274,7 @@ class OpenSearchAdapterClient(AsyncBaseCoreClient):
         base_url = str(request.base_url)
 
         collections: List[Collection] = []
-        for c in self.catalogue.get_collections():
+        for c in await self._get_collections():
             collections.append(await self._collection_adapter(c, base_url))
 
         links = [
@@ -243,7 +309,7 @@ class OpenSearchAdapterClient(AsyncBaseCoreClient):
         base_url = str(request.base_url)
 
         try:
-            collections = list(self.catalogue.get_collections(uid=id))
+            collections = await self._get_collections(uid=id)
         except terracatalogueclient.exceptions.SearchException as e:
             collections = []
         if len(collections) != 1:
@@ -290,20 +356,314 @@ class OpenSearchAdapterClient(AsyncBaseCoreClient):
         request: Request = kwargs["request"]
         base_url = str(request.base_url)
 
+        # no separate collection check: the product lookup fails as well if the collection does not exist
+        product = await self._get_product(collection_id, item_id)
+        if product is None:
+            raise NotFoundError(f"Item {item_id} does not exist in collection {collection_id}.")
+
+        return await self._item_adapter(product, collection_id, base_url)
+
+    async def get_items(self, collection_id: str, ids: List[str], **kwargs) -> ItemCollection:
+        """
+        Get multiple items of a collection by ID.
+
+        Called with `POST /collections/{collection_id}/bulk-items`
+
+        :param collection_id: collection ID
+        :param ids: item IDs
+        :return: item collection containing the items that were found, in the requested order
+        """
+        request: Request = kwargs["request"]
+        base_url = str(request.base_url)
+
         # check if collection exists, if not, a NotFoundError will be raised
         await self.get_collection(collection_id, **kwargs)
 
+        products = await self._get_products(collection_id, ids)
+        items = [
+            await self._item_adapter(products[item_id], collection_id, base_url)
+            for item_id in OrderedDict.fromkeys(ids)
+            if products.get(item_id) is not None
+        ]
+
+        return ItemCollection(
+            type="FeatureCollection",
+            features=items,
+            links=[]
+        )
+
+    async def _get_collections(self, **kwargs) -> List[terracatalogueclient.Collection]:
+        """
+        Get collections from the catalogue without blocking the event loop.
+        A federated catalogue queries all of its backends concurrently.
+
+        :param kwargs: OpenSearch query parameters
+        :return: collections
+        """
+        return await run_in_threadpool(lambda: list(self.catalogue.get_collections(**kwargs)))
+
+    def _find_product(self, collection_id: str, item_id: str) -> Optional[terracatalogueclient.Product]:
+        """
+        Look up a single product in the catalogue.
+
+        :param collection_id: collection ID
+        :param item_id: item ID
+        :return: product, or `None` if it does not exist
+        """
         try:
-            [product] = list(self.catalogue.get_products(collection=collection_id, uid=item_id))
-            # raises ValueError when cannot unpack 1 value from list
-            return await self._item_adapter(product, collection_id, base_url)
-        except (terracatalogueclient.exceptions.SearchException, ValueError):
-            raise NotFoundError(f"Item {item_id} does not exist in collection {collection_id}.")
+            products = list(self.catalogue.get_products(collection=collection_id, uid=item_id))
+        except terracatalogueclient.exceptions.SearchException:
+            return None
+        return products[0] if len(products) == 1 else None
+
+    async def _get_product(self, collection_id: str, item_id: str) -> Optional[terracatalogueclient.Product]:
+        """
+        Look up a single product without blocking the event loop.
+
+        :param collection_id: collection ID
+        :param item_id: item ID
+        :return: product, or `None` if it does not exist
+        """
+        return await run_in_threadpool(self._find_product, collection_id, item_id)
+
+    async def _get_products(self, collection_id: str, ids: List[str]) -> Dict[str, Optional[terracatalogueclient.Product]]:
+        """
+        Look up multiple products of a collection concurrently.
+        Duplicate identifiers are only queried once.
+
+        :param collection_id: collection ID
+        :param ids: item IDs
+        :return: mapping of item ID to product, or `None` for items that do not exist
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        async def get_product(item_id: str) -> Optional[terracatalogueclient.Product]:
+            async with semaphore:
+                return await self._get_product(collection_id, item_id)
+
+        unique_ids = list(OrderedDict.fromkeys(ids))
+        products = await asyncio.gather(*(get_product(item_id) for item_id in unique_ids))
+        return dict(zip(unique_ids, products))
+
+    @staticmethod
+    def _query_params(search_request: AdaptedSearch) -> dict:
+        """
+        Translates the filters of a search request to OpenSearch query parameters.
+
+        :param search_request: search request parameters
+        :return: OpenSearch query parameters
+        """
+        query_params = dict()
+        if search_request.datetime is not None:
+            query_params['start'] = search_request.start_date
+            query_params['end'] = search_request.end_date
+        if search_request.bbox is not None:
+            query_params['bbox'] = list(search_request.bbox)
+        if search_request.intersects is not None:
+            query_params['geometry'] = shape(search_request.intersects).wkt
+        query_params.update(translate_query(search_request.query))
+        return query_params
+
+    async def _iter_product_pages(self, collection_id: str, query_params: dict) -> AsyncIterator[List[terracatalogueclient.Product]]:
+        """
+        Iterates over all products matching the query, one backend page at a time.
+        The next page is already requested while the current page is being processed.
+
+        :param collection_id: collection ID
+        :param query_params: OpenSearch query parameters
+        :return: asynchronous iterator of product pages
+        """
+        def get_page(start_index: int) -> List[terracatalogueclient.Product]:
+            return self._fetch_products(collection_id, start_index, self.backend_page_size, query_params)
+
+        start_index = 1
+        next_page = asyncio.ensure_future(run_in_threadpool(get_page, start_index))
+        while next_page is not None:
+            page = await next_page
+            start_index += len(page)
+            if len(page) == self.backend_page_size:
+                next_page = asyncio.ensure_future(run_in_threadpool(get_page, start_index))
+            else:
+                next_page = None
+            if len(page) > 0:
+                yield page
+
+    async def export_items(
+            self,
+            id: str,
+            bbox: Optional[List[NumType]] = None,
+            datetime: Optional[str] = None,
+            format: ExportFormat = ExportFormat.ndjson,
+            **kwargs
+    ) -> StreamingResponse:
+        """
+        Export all items of a collection in a single streamed response.
+
+        Called with `GET /collections/{id}/export`
+
+        :param id: collection ID
+        :param bbox: bounding box
+        :param datetime: start/end time
+        :param format: export format
+        :return: streaming response containing the items
+        """
+        request: Request = kwargs["request"]
+        base_url = str(request.base_url)
+
+        # validate before the response starts, errors cannot be reported once streaming has begun
+        await self.get_collection(id, **kwargs)
+
+        base_args = {
+            "collections": [id],
+            "bbox": bbox,
+        }
+        if datetime:
+            base_args["datetime"] = datetime
+        try:
+            search_request = self.search_request_model(**base_args)
+        except ValidationError:
+            raise HTTPException(status_code=400, detail="Invalid parameters provided.")
+        query_params = self._query_params(search_request)
+
+        try:
+            writer = get_item_writer(format)
+        except RuntimeError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+
+        async def content() -> AsyncIterator[bytes]:
+            async for page in self._iter_product_pages(id, query_params):
+                yield writer.write([await self._item_adapter(p, id, base_url=base_url) for p in page])
+            yield writer.close()
+
+        return StreamingResponse(
+            content(),
+            media_type=writer.media_type,
+            headers={"Content-Disposition": f'attachment; filename="{id}.{writer.file_extension}"'}
+        )
+
+    def _fetch_products(self, collection_id: str, start_index: int, count: int, query_params: dict) -> List[terracatalogueclient.Product]:
+        """
+        Fetch a range of the products matching the query.
+
+        :param collection_id: collection ID
+        :param start_index: index of the first product, starting at 1
+        :param count: number of products
+        :param query_params: OpenSearch query parameters
+        :return: products
+        """
+        return list(self.catalogue.get_products(
+            collection=collection_id,
+            startIndex=start_index,
+            count=count,
+            limit=count,
+            **query_params
+        ))
+
+    async def _collection_position(self, collections: List[str], index: int, query_params: dict, sortby: str) -> Optional[PagingToken]:
+        """
+        Get the position at the start of a collection in the search results.
+
+        :param collections: collections to search
+        :param index: index of the collection in `collections`
+        :param query_params: OpenSearch query parameters
+        :param sortby: OpenSearch sort keys
+        :return: position at the first product of the collection, or `None` if there are no more collections
+        """
+        if index >= len(collections):
+            return None
+        collection = collections[index]
+        hit_count = await run_in_threadpool(self.catalogue.get_product_count, collection=collection, **query_params)
+        return PagingToken(collection, 1, hit_count, sortby)
+
+    async def _collection_extents(self) -> Dict[str, dict]:
+        """
+        Get the extents of all collections, which are cached for `collection_cache_ttl` seconds.
+
+        :return: mapping of collection ID to STAC extent, in catalogue order
+        """
+        if self._extent_cache is None or time.monotonic() - self._extent_cache[0] > self.collection_cache_ttl:
+            extents = OrderedDict((c.id, self._collection_extent(c)) for c in await self._get_collections())
+            self._extent_cache = (time.monotonic(), extents)
+        return self._extent_cache[1]
+
+    async def _plan_search(self, extents: Dict[str, dict], query_params: dict, sortby: str) -> Optional[PagingToken]:
+        """
+        Plan a search over all collections.
+        Collections of which the extent does not intersect the query are pruned, the hit counts of the remaining
+        collections are requested concurrently and collections without hits, or of which the backend is unavailable, are
+        skipped.
+
+        :param extents: extents of all collections, as returned by `_collection_extents`
+        :param query_params: OpenSearch query parameters
+        :param sortby: OpenSearch sort keys
+        :return: position at the first product of the first planned collection, with the remaining collections as
+            plan, or `None` if no collection has hits
+        """
+        collections = list(extents)
+        candidates = [
+            index for index, collection in enumerate(collections) if extent_intersects(extents[collection], query_params)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        async def get_hit_count(index: int) -> int:
+            async with semaphore:
+                try:
+                    return await run_in_threadpool(
+                        self.catalogue.get_product_count, collection=collections[index], **query_params
+                    )
+                except (
+                        BackendUnavailableError, terracatalogueclient.exceptions.SearchException, requests.RequestException
+                ) as e:
+                    # a collection that cannot be counted because its backend is unavailable does not fail the search
+                    logger.warning(f"Collection {collections[index]} is left out of the search: {e}")
+                    return 0
+
+        hit_counts = await asyncio.gather(*(get_hit_count(index) for index in candidates))
+        plan = [(index, hit_count) for index, hit_count in zip(candidates, hit_counts) if hit_count > 0]
+        if len(plan) == 0:
+            return None
+        (index, hit_count), *remaining = plan
+        return PagingToken(collections[index], 1, hit_count, sortby, remaining, self._collections_digest(collections))
+
+    @staticmethod
+    def _collections_digest(collections: List[str]) -> str:
+        """
+        Get a short digest of an ordered list of collections, which identifies the list a search plan refers to.
+
+        :param collections: collection IDs
+        :return: digest
+        """
+        return hashlib.sha1("\n".join(collections).encode("utf-8")).hexdigest()[:16]
+
+    async def _next_position(self, position: PagingToken, collections: List[str], query_params: dict) -> Optional[PagingToken]:
+        """
+        Get the position at the start of the collection following the collection of the given position.
+
+        :param position: current position
+        :param collections: collections to search, or all collections that the plan refers to if the search is planned
+        :param query_params: OpenSearch query parameters
+        :return: position at the first product of the next collection, or `None` if there are no more collections
+        """
+        if position.plan is not None:
+            if len(position.plan) == 0:
+                return None
+            (index, hit_count), *remaining = position.plan
+            return PagingToken(collections[index], 1, hit_count, position.sortby, remaining, position.plan_digest)
+        return await self._collection_position(
+            collections, collections.index(position.collection) + 1, query_params, position.sortby
+        )
 
     async def _search_base(self, search_request: AdaptedSearch, **kwargs) -> ItemCollection:
         """
         Implements cross-catalog search.
         Multiple collections are supported by iterating over the collections. Supports paging.
+        If no collections are specified, the collections to search are planned up front and the plan is kept in the
+        paging token.
+        Products are read through the product buffer, so the backend page size does not depend on the limit.
+        Sorting is done by the OpenSearch backend within a collection, so it is only supported when a single collection
+        is searched.
+        The parts of a CQL2 filter that OpenSearch supports are pushed down, the residual filter is evaluated on the
+        items while filling the page.
 
         :param search_request: search request parameters
         :return: item collection containing the search results
@@ -313,64 +673,122 @@ class OpenSearchAdapterClient(AsyncBaseCoreClient):
 
         next_token: Optional[str] = None
         items: List[Item] = []
-
-        if search_request.collections is None:
-            search_request.collections = [collection.id for collection in self.catalogue.get_collections()]
+        # validate the sort order and filter before querying the backend
+        sortby = sort_keys(search_request.sortby)
+        if sortby and (search_request.collections is None or len(set(search_request.collections)) > 1):
+            # the results of multiple collections would be sorted per collection, one collection after another
+            raise InvalidQueryParameter("Sorting is only supported when searching a single collection.")
+        cql2_filter = None
+        if search_request.filter is not None:
+            try:
+                cql2_filter = parse_filter(search_request.filter, search_request.filter_lang)
+            except ValueError as e:
+                raise InvalidQueryParameter(f"Invalid filter: {e}")
 
         if search_request.ids is not None:
-            # only return the requested ids
-            for item_id in set(search_request.ids):
-                for collection_id in search_request.collections:
-                    try:
-                        results = list(self.catalogue.get_products(collection=collection_id, uid=item_id))
-                        if len(results) == 1:
-                            items.append(await self._item_adapter(results[0], collection_id, base_url=base_url))
-                            break
-                    except terracatalogueclient.exceptions.SearchException:
-                        pass
+            if search_request.collections is None:
+                search_request.collections = [collection.id for collection in await self._get_collections()]
+            # only return the requested ids, looking up the remaining ids in the next collection
+            remaining_ids = list(OrderedDict.fromkeys(search_request.ids))
+            for collection_id in search_request.collections:
+                if len(remaining_ids) == 0:
+                    break
+                products = await self._get_products(collection_id, remaining_ids)
+                for item_id in remaining_ids:
+                    if products[item_id] is not None:
+                        items.append(await self._item_adapter(products[item_id], collection_id, base_url=base_url))
+                remaining_ids = [item_id for item_id in remaining_ids if products[item_id] is None]
+            if cql2_filter is not None:
+                try:
+                    predicate = compile_filter(cql2_filter)
+                except ValueError as e:
+                    raise InvalidQueryParameter(f"Invalid filter: {e}")
+                items = [item for item in items if predicate(item)]
         else:
             # perform full query
-            query_params = dict()
-            if search_request.datetime is not None:
-                query_params['start'] = search_request.start_date
-                query_params['end'] = search_request.end_date
-            if search_request.bbox is not None:
-                query_params['bbox'] = list(search_request.bbox)
-            if search_request.intersects is not None:
-                query_params['geometry'] = shape(search_request.intersects).wkt
-            if search_request.token is not None:
+            query_params = self._query_params(search_request)
+            predicate: Optional[Callable[[Item], bool]] = None
+            if cql2_filter is not None:
                 try:
-                    collection, start_index, collection_hit_count = search_request.token.split(",")
-                    start_index = int(start_index)
-                    collection_hit_count = int(collection_hit_count)
+                    pushdown_params, residual_filter = split_filter(cql2_filter, query_params)
+                    if residual_filter is not None:
+                        predicate = compile_filter(residual_filter)
+                except ValueError as e:
+                    raise InvalidQueryParameter(f"Invalid filter: {e}")
+                query_params.update(pushdown_params)
+            product_params = {**query_params, 'sortKeys': sortby} if sortby else query_params
+            extents: Optional[Dict[str, dict]] = None
+            collections = search_request.collections
+            if collections is None:
+                # a plan refers to the collections by index, so the collections are loaded once for the whole request
+                extents = await self._collection_extents()
+                collections = list(extents)
 
-                    query_params['startIndex'] = start_index
+            if search_request.token is not None:
+                try:
+                    position = PagingToken.parse(search_request.token)
                 except ValueError:
                     raise InvalidQueryParameter("Invalid value for token parameter.")
+                if search_request.collections is None:
+                    valid = position.plan is not None
+                    if valid:
+                        if position.plan_digest != self._collections_digest(collections):
+                            raise InvalidQueryParameter(
+                                "The collections changed since the search started, restart the search without token."
+                            )
+                        valid = all(0 <= index < len(collections) for index, _ in position.plan)
+                else:
+                    valid = position.plan is None and position.collection in search_request.collections
+                if not valid or position.sortby != sortby:
+                    raise InvalidQueryParameter("Token does not match the search parameters.")
+            elif search_request.collections is None:
+                position = await self._plan_search(extents, query_params, sortby)
             else:
-                collection = search_request.collections[0]
-                start_index = 1
-                collection_hit_count = self.catalogue.get_product_count(collection=collection, **query_params)
+                position = await self._collection_position(search_request.collections, 0, query_params, sortby)
+
+            # fill the page, continuing in the next collection when a collection is exhausted
+            # the number of products scanned per page is bounded, so a selective residual filter can return a partial page
+            batch_size = 0
+            scanned = 0
+            while position is not None and len(items) < search_request.limit and scanned < self.max_filter_scan:
+                if position.start_index > position.hit_count:
+                    position = await self._next_position(position, collections, query_params)
+                    continue
+
+                needed = search_request.limit - len(items)
+                # without residual filter every product becomes an item, otherwise the batches grow as long as the
+                # filter keeps rejecting products
+                batch_size = needed if predicate is None else min(max(needed, 2 * batch_size), self.backend_page_size)
+                batch_size = min(batch_size, position.hit_count - position.start_index + 1)
+                # products are read through the buffer, which fetches ahead independently of the page size
+                cursor = self.product_buffer.cursor(position.collection, product_params)
+                products = await self.product_buffer.read(
+                    cursor,
+                    position.start_index,
+                    batch_size,
+                    position.hit_count - position.start_index + 1,
+                    partial(self._fetch_products, position.collection, query_params=product_params)
+                )
 
-            if start_index + search_request.limit - 1 < collection_hit_count:
-                next_index = start_index + search_request.limit
-                next_token = f"{collection},{next_index},{collection_hit_count}"
-            else:
-                # link to next collection (if available)
-                next_collection_idx = search_request.collections.index(collection) + 1
-                next_collection = search_request.collections[next_collection_idx] if len(search_request.collections) > next_collection_idx else None
-                if next_collection is not None:
-                    next_collection_hit_count = self.catalogue.get_product_count(collection=next_collection, **query_params)
-                    next_token = f"{next_collection},1,{next_collection_hit_count}"
-
-            products = self.catalogue.get_products(
-                collection=collection,
-                limit=search_request.limit,
-                **query_params
-            )
-
-            for p in products:
-                items.append(await self._item_adapter(p, collection, base_url=base_url))
+                consumed = 0
+                for p in products:
+                    consumed += 1
+                    scanned += 1
+                    item = await self._item_adapter(p, position.collection, base_url=base_url)
+                    if predicate is None or predicate(item):
+                        items.append(item)
+                        if len(items) == search_request.limit:
+                            break
+                if len(products) == 0:
+                    # the hit count was outdated, the collection is exhausted
+                    position.hit_count = position.start_index - 1
+                position.start_index += consumed
+                self.product_buffer.unread(cursor, position.start_index, products[consumed:])
+
+            if position is not None and position.start_index > position.hit_count:
+                position = await self._next_position(position, collections, query_params)
+            next_token = str(position) if position is not None else None
+            self.product_buffer.metrics.client_pages += 1
 
         return ItemCollection(
             type="FeatureCollection",
@@ -382,6 +800,25 @@ class OpenSearchAdapterClient(AsyncBaseCoreClient):
             ).create_links()
         )
 
+    async def get_metrics(self, **kwargs) -> Dict[str, Any]:
+        """
+        Get the paging metrics.
+
+        Called with `GET /metrics`
+
+        :return: backend requests per search page and product buffer usage
+        """
+        metrics = self.product_buffer.metrics
+        return {
+            **attr.asdict(metrics),
+            "backend_requests_per_page": metrics.backend_requests_per_page,
+            "buffer": {
+                "products": self.product_buffer.buffered_products,
+                "size": self.product_buffer.size,
+                "memory_budget": self.product_buffer.memory_budget,
+            }
+        }
+
     async def get_search(
             self,
             collections: Optional[List[str]] = None,
@@ -392,7 +829,9 @@ class OpenSearchAdapterClient(AsyncBaseCoreClient):
             query: Optional[str] = None,
             token: Optional[str] = None,
             fields: Optional[List[str]] = None,
-            sortby: Optional[str] = None,
+            sortby: Optional[List[str]] = None,
+            filter: Optional[str] = None,
+            filter_lang: Optional[str] = None,
             **kwargs
     ) -> ItemCollection:
         """
@@ -405,10 +844,12 @@ class OpenSearchAdapterClient(AsyncBaseCoreClient):
         :param bbox: bounding box
         :param datetime: start/end time
         :param limit: maximum number of results per page
-        :param query:
+        :param query: query extension filter as JSON, eg. `{"eo:cloud_cover": {"lt": 20}}`
         :param token: pagination token
         :param fields:
-        :param sortby:
+        :param sortby: sort order, eg. `-datetime`
+        :param filter: CQL2 filter
+        :param filter_lang: CQL2 filter language, `cql2-text` by default
         :return: item collection containing the query results
         """
         # parse request parameters
@@ -418,8 +859,17 @@ class OpenSearchAdapterClient(AsyncBaseCoreClient):
             "bbox": bbox,
             "limit": limit,
             "token": token,
-            "query": json.loads(query) if query else query,
         }
+        if query:
+            try:
+                base_args["query"] = json.loads(query)
+            except json.JSONDecodeError:
+                raise InvalidQueryParameter("Invalid value for query parameter, expected a JSON object.")
+        if sortby:
+            base_args["sortby"] = [parse_sortby_param(s) for s in sortby]
+        if filter:
+            base_args["filter"] = filter
+            base_args["filter_lang"] = filter_lang or "cql2-text"
         if datetime:
             base_args["datetime"] = datetime
         try:
@@ -439,3 +889,46 @@ class OpenSearchAdapterClient(AsyncBaseCoreClient):
         :return: item collection containing the query results
         """
         return await self._search_base(search_request, **kwargs)
+
+
+@attr.s
+class OpenSearchFiltersClient(AsyncBaseFiltersClient):
+    """Queryables of the STAC filter extension."""
+
+    async def get_queryables(self, collection_id: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Get the queryables, which are the same for all collections.
+
+        Called with `GET /queryables` or `GET /collections/{collection_id}/queryables`
+
+        :param collection_id: collection ID
+        :return: JSON schema of the queryable properties
+        """
+        request: Request = kwargs["request"]
+        base_url = str(request.base_url)
+
+        properties = {
+            "id": {"description": "Item identifier", "type": "string"},
+            "collection": {"description": "Collection identifier", "type": "string"},
+            "geometry": {"description": "Item geometry", "$ref": "https://geojson.org/schema/Geometry.json"},
+            "datetime": {"description": "Acquisition date and time", "type": "string", "format": "date-time"},
+            "start_datetime": {"type": "string", "format": "date-time"},
+            "end_datetime": {"type": "string", "format": "date-time"},
+            "title": {"type": "string"},
+            "created": {"type": "string", "format": "date-time"},
+            "updated": {"type": "string", "format": "date-time"},
+            "platform": {"type": "string"},
+            "eo:cloud_cover": {"type": "number", "minimum": 0, "maximum": 100},
+            "sat:orbit_state": {"type": "string", "enum": ["ascending", "descending"]},
+            "sat:relative_orbit": {"type": "integer", "minimum": 1},
+            "product:type": {"type": "string"},
+            "grid:code": {"type": "string"},
+        }
+        return {
+            "$schema": "https://json-schema.org/draft/2019-09/schema",
+            "$id": urljoin(base_url, "queryables"),
+            "type": "object",
+            "title": "Queryables",
+            "properties": properties,
+            "additionalProperties": True
+        }
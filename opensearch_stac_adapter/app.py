@@ -3,20 +3,42 @@ from stac_fastapi.api.app import ApiSettings
 from fastapi import FastAPI, Request
 from fastapi.openapi.utils import get_openapi
 from asgi_logger import AccessLoggerMiddleware
-from opensearch_stac_adapter.adapter import OpenSearchAdapterClient
-from opensearch_stac_adapter.models.search import AdaptedSearch
+from stac_fastapi.extensions.core import SortExtension, QueryExtension, FilterExtension
+from opensearch_stac_adapter.adapter import OpenSearchAdapterClient, OpenSearchFiltersClient
+from opensearch_stac_adapter.extensions import BulkItemsExtension, ExportExtension, MetricsExtension
+from opensearch_stac_adapter.cql2 import FILTER_CONFORMANCE_CLASSES
+from opensearch_stac_adapter.models.search import AdaptedSearch, AdaptedSearchGetRequest
+from opensearch_stac_adapter.federation import FederatedCatalogue
 import logging
+import os
 from typing import Optional, Dict, Any
 
 settings = ApiSettings()
+# federate multiple catalogues if configured, otherwise the Terrascope catalogue is used
+federation_config = os.environ.get("FEDERATION_CONFIG")
+if federation_config:
+    client = OpenSearchAdapterClient(
+        landing_page_id="terrascope",
+        catalogue=FederatedCatalogue.from_file(federation_config)
+    )
+else:
+    client = OpenSearchAdapterClient(landing_page_id="terrascope")
 
 api = StacApi(
     settings=settings,
-    client=OpenSearchAdapterClient(landing_page_id="terrascope"),
-    extensions=[],
+    client=client,
+    extensions=[
+        BulkItemsExtension(client=client),
+        ExportExtension(client=client),
+        MetricsExtension(client=client),
+        SortExtension(),
+        QueryExtension(),
+        FilterExtension(client=OpenSearchFiltersClient(), conformance_classes=FILTER_CONFORMANCE_CLASSES)
+    ],
     title="Terrascope - STAC API",
     description="VITO Remote Sensing EO Data Catalogue - Terrascope platform.",
     search_request_model=AdaptedSearch,
+    search_get_request=AdaptedSearchGetRequest,
     middlewares=[]
 )
 
@@ -0,0 +1,213 @@
+import asyncio
+import attr
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+import terracatalogueclient
+
+
+# fetches a range of products, given the index of the first product (starting at 1) and the number of products
+FetchProducts = Callable[[int, int], List[terracatalogueclient.Product]]
+
+
+@attr.s
+class PagingMetrics:
+    """Counters of the search pages served to clients and the backend requests needed to serve them."""
+    client_pages: int = attr.ib(default=0)  # search pages returned to clients
+    backend_requests: int = attr.ib(default=0)  # product requests sent to the backend
+    fetched_products: int = attr.ib(default=0)  # products returned by the backend
+    buffered_products_read: int = attr.ib(default=0)  # products read from the buffer instead of the backend
+    evicted_products: int = attr.ib(default=0)  # buffered products dropped to stay within the buffer limits
+
+    @property
+    def backend_requests_per_page(self) -> Optional[float]:
+        return self.backend_requests / self.client_pages if self.client_pages > 0 else None
+
+
+@attr.s
+class _Segment:
+    """Products of a search cursor that were fetched but not served yet."""
+    start_index: int = attr.ib()  # index of the first product, starting at 1
+    products: List[terracatalogueclient.Product] = attr.ib()
+    page_size: int = attr.ib()  # number of products of the last backend fetch of the cursor
+    size: int = attr.ib()  # estimated memory size in bytes
+    fetched_at: float = attr.ib()  # monotonic time at which the products were fetched
+
+
+def _estimate_size(products: List[terracatalogueclient.Product]) -> int:
+    """Estimates the memory size of products from the serialized size of the first one."""
+    if len(products) == 0:
+        return 0
+    return len(json.dumps(products[0].geojson, separators=(",", ":"))) * len(products)
+
+
+@attr.s
+class ProductBuffer:
+    """
+    Buffer of products fetched ahead of the search pages that are served to clients.
+
+    Backend page sizes are chosen independently of the page size of the client: a cursor starts with `min_page_size`
+    products and doubles its fetch size on every continuation, up to `max_page_size`. The products that are not
+    served yet are kept in segments, keyed by the search cursor and the index at which the next page continues, so
+    clients paging the same search at different offsets do not evict each other's products. A read at an index
+    without a segment starts over with `min_page_size`. Segments older than `max_age` are not served, and the least
+    recently used segments are dropped when the buffered products exceed the memory budget. Fetches larger than
+    `max_page_size` are split in concurrent sub-requests.
+    """
+    memory_budget: int = attr.ib(default=64 * 1024 * 1024)  # maximum estimated size of the buffered products in bytes
+    min_page_size: int = attr.ib(default=100)  # number of products of the first fetch of a cursor
+    max_page_size: int = attr.ib(default=1000)  # maximum number of products per backend request
+    max_concurrent_requests: int = attr.ib(default=8)  # maximum number of concurrent sub-requests of a fetch
+    max_segments: int = attr.ib(default=10000)  # maximum number of buffered segments
+    max_age: float = attr.ib(default=60.0)  # maximum age of buffered products in seconds
+    metrics: PagingMetrics = attr.ib(factory=PagingMetrics)
+    _segments: Dict[Tuple[Tuple[str, str], int], _Segment] = attr.ib(init=False, factory=OrderedDict)
+    _size: int = attr.ib(init=False, default=0)
+
+    @staticmethod
+    def cursor(collection: str, query_params: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Get the key of a search cursor.
+
+        :param collection: collection ID
+        :param query_params: OpenSearch query parameters, including the sort keys
+        :return: cursor key
+        """
+        return collection, json.dumps(query_params, sort_keys=True, default=str)
+
+    @property
+    def size(self) -> int:
+        """Estimated memory size of the buffered products in bytes."""
+        return self._size
+
+    @property
+    def buffered_products(self) -> int:
+        return sum(len(segment.products) for segment in self._segments.values())
+
+    async def read(
+            self,
+            cursor: Tuple[str, str],
+            start_index: int,
+            count: int,
+            remaining: int,
+            fetch: FetchProducts
+    ) -> List[terracatalogueclient.Product]:
+        """
+        Read products of a search cursor, fetching them from the backend if they are not buffered.
+
+        :param cursor: cursor key
+        :param start_index: index of the first product, starting at 1
+        :param count: number of products
+        :param remaining: number of products of the cursor from `start_index` on, according to the hit count
+        :param fetch: function that fetches a range of products from the backend
+        :return: products, fewer than `count` if the cursor is exhausted
+        """
+        segment = self._pop((cursor, start_index))
+        if segment is not None and time.monotonic() - segment.fetched_at > self.max_age:
+            self.metrics.evicted_products += len(segment.products)
+            segment = None
+
+        page_size = 0
+        products: List[terracatalogueclient.Product] = []
+        if segment is not None:
+            page_size = segment.page_size
+            products = segment.products[:count]
+            self.metrics.buffered_products_read += len(products)
+
+        missing = min(count, remaining) - len(products)
+        if missing <= 0:
+            if segment is not None:
+                self._push(
+                    cursor, start_index + len(products), segment.products[len(products):], page_size, segment.fetched_at
+                )
+            return products
+
+        # grow the fetch size on every continuation of the cursor, a fetch contains at least the missing products
+        page_size = min(2 * page_size, self.max_page_size) if page_size > 0 else self.min_page_size
+        fetch_start = start_index + len(products)
+        fetch_count = min(max(missing, page_size), remaining - len(products))
+        fetched_at = time.monotonic()
+        fetched = await self._fetch(fetch, fetch_start, fetch_count)
+
+        products.extend(fetched[:missing])
+        self._push(cursor, fetch_start + len(fetched[:missing]), fetched[missing:], page_size, fetched_at)
+        return products
+
+    async def _fetch(self, fetch: FetchProducts, start_index: int, count: int) -> List[terracatalogueclient.Product]:
+        """Fetches a range of products, split in concurrent sub-requests of at most `max_page_size` products."""
+        ranges = [
+            (index, min(self.max_page_size, start_index + count - index))
+            for index in range(start_index, start_index + count, self.max_page_size)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        async def fetch_range(index: int, range_count: int) -> List[terracatalogueclient.Product]:
+            async with semaphore:
+                return await run_in_threadpool(fetch, index, range_count)
+
+        pages = await asyncio.gather(*(fetch_range(index, range_count) for index, range_count in ranges))
+        self.metrics.backend_requests += len(ranges)
+
+        products = []
+        for page, (_, range_count) in zip(pages, ranges):
+            products.extend(page)
+            if len(page) < range_count:
+                # the cursor is exhausted, later ranges cannot follow on a gap
+                break
+        self.metrics.fetched_products += len(products)
+        return products
+
+    def unread(self, cursor: Tuple[str, str], start_index: int, products: List[terracatalogueclient.Product]) -> None:
+        """
+        Return products that were read but not served, so they are read again by the next continuation of the cursor.
+
+        :param cursor: cursor key
+        :param start_index: index of the first product, starting at 1
+        :param products: products that were not served
+        """
+        if len(products) == 0:
+            return
+        # the products precede the segment that was buffered by the read
+        segment = self._pop((cursor, start_index + len(products)))
+        if segment is not None:
+            self._push(cursor, start_index, products + segment.products, segment.page_size, segment.fetched_at)
+        else:
+            self._push(cursor, start_index, products, self.min_page_size, time.monotonic())
+
+    def _pop(self, key: Tuple[Tuple[str, str], int]) -> Optional[_Segment]:
+        segment = self._segments.pop(key, None)
+        if segment is not None:
+            self._size -= segment.size
+        return segment
+
+    def _push(
+            self,
+            cursor: Tuple[str, str],
+            start_index: int,
+            products: List[terracatalogueclient.Product],
+            page_size: int,
+            fetched_at: float
+    ) -> None:
+        """
+        Buffers products as the most recently used segment, evicting the least recently used segments if needed.
+        Exhausted segments are kept as well, so the next continuation of the cursor grows its fetch size. Reads only
+        buffer an exhausted segment at the index at which the cursor continues.
+        """
+        # a concurrent read of the same cursor can have buffered products at the same index in the meantime
+        self._pop((cursor, start_index))
+        segment = _Segment(start_index, products, page_size, _estimate_size(products), fetched_at)
+        if segment.size > self.memory_budget:
+            self.metrics.evicted_products += len(products)
+            return
+        while len(self._segments) > 0 and (
+                self._size + segment.size > self.memory_budget or len(self._segments) >= self.max_segments
+        ):
+            _, evicted = self._segments.popitem(last=False)
+            self._size -= evicted.size
+            self.metrics.evicted_products += len(evicted.products)
+        self._segments[(cursor, start_index)] = segment
+        self._size += segment.size
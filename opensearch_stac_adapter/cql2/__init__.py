@@ -0,0 +1,79 @@
+import json
+from typing import Any, Optional, Union
+
+from stac_fastapi.extensions.core.filter import FilterConformanceClasses
+
+from opensearch_stac_adapter.cql2.text import parse_text
+from opensearch_stac_adapter.cql2.pushdown import split_filter
+from opensearch_stac_adapter.cql2.predicate import compile_filter
+
+
+FILTER_LANGUAGES = ("cql2-text", "cql2-json")
+
+FILTER_CONFORMANCE_CLASSES = [
+    FilterConformanceClasses.FILTER,
+    FilterConformanceClasses.ITEM_SEARCH_FILTER,
+    FilterConformanceClasses.CQL_TEXT,
+    FilterConformanceClasses.CQL_JSON,
+    FilterConformanceClasses.BASIC_CQL,
+    FilterConformanceClasses.BASIC_SPATIAL_OPERATORS,
+    FilterConformanceClasses.BASIC_TEMPORAL_OPERATORS,
+    FilterConformanceClasses.ENHANCED_COMPARISON_OPERATORS,
+    FilterConformanceClasses.ENHANCED_SPATIAL_OPERATORS,
+    FilterConformanceClasses.ENHANCED_TEMPORAL_OPERATORS,
+]
+
+
+def parse_filter(filter: Union[str, dict], filter_lang: Optional[str] = None) -> Any:
+    """
+    Parses a CQL2 filter to its CQL2 JSON representation.
+
+    :param filter: CQL2 text or JSON filter
+    :param filter_lang: filter language, inferred from the type of the filter if not provided
+    :return: CQL2 JSON filter
+    :raises ValueError: if the filter cannot be parsed
+    """
+    if filter_lang is None:
+        filter_lang = "cql2-text" if isinstance(filter, str) else "cql2-json"
+    if filter_lang not in FILTER_LANGUAGES:
+        raise ValueError(f"filter language {filter_lang} is not supported, supported languages: "
+                         f"{', '.join(FILTER_LANGUAGES)}")
+
+    if filter_lang == "cql2-text":
+        if not isinstance(filter, str):
+            raise ValueError("a cql2-text filter must be a string")
+        return parse_text(filter)
+    if isinstance(filter, str):
+        filter = json.loads(filter)
+    if not isinstance(filter, (dict, bool)):
+        raise ValueError("a cql2-json filter must be an object")
+    _check_node(filter)
+    return filter
+
+
+def _check_node(node: Any) -> None:
+    """
+    Checks the structure of the operations, property references and literals of a CQL2 JSON filter.
+
+    :param node: CQL2 JSON node
+    :raises ValueError: if an operation, property reference or literal is malformed
+    """
+    if isinstance(node, list):
+        for value in node:
+            _check_node(value)
+    elif isinstance(node, dict):
+        if "op" in node:
+            if not isinstance(node["op"], str):
+                raise ValueError(f"operator must be a string, found {node['op']!r}")
+            if not isinstance(node.get("args"), list):
+                raise ValueError(f"arguments of {node['op']} must be a list")
+            _check_node(node["args"])
+        elif "property" in node and not isinstance(node["property"], str):
+            raise ValueError(f"property name must be a string, found {node['property']!r}")
+        elif "interval" in node and (not isinstance(node["interval"], list) or len(node["interval"]) != 2):
+            raise ValueError(f"an interval requires a start and an end, found {node['interval']!r}")
+        elif "bbox" in node and (not isinstance(node["bbox"], list) or len(node["bbox"]) not in (4, 6)):
+            raise ValueError(f"a bbox requires 4 or 6 coordinates, found {node['bbox']!r}")
+        elif ("timestamp" in node or "date" in node) \
+                and not isinstance(node.get("timestamp", node.get("date")), str):
+            raise ValueError(f"a timestamp or date must be a string, found {node!r}")
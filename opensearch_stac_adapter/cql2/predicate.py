@@ -0,0 +1,361 @@
+import re
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from shapely.geometry import shape, box
+from shapely.geometry.base import BaseGeometry
+
+from stac_fastapi.types.stac import Item
+
+from opensearch_stac_adapter.dates import parse_datetime
+
+
+# an evaluated predicate is True, False or None when the result is unknown, eg. when a property is missing
+Predicate = Callable[["_ItemContext"], Optional[bool]]
+Getter = Callable[["_ItemContext"], Any]
+Interval = Tuple[datetime, datetime]
+
+_MIN_DATETIME = datetime.min.replace(tzinfo=timezone.utc)
+_MAX_DATETIME = datetime.max.replace(tzinfo=timezone.utc)
+
+
+def _parse_interval(value: Any) -> Optional[Interval]:
+    """Parses an instant or a `start/end` interval of an item property."""
+    if value is None:
+        return None
+    if isinstance(value, str) and "/" in value:
+        start, end = value.split("/", 1)
+        return parse_datetime(start) or _MIN_DATETIME, parse_datetime(end) or _MAX_DATETIME
+    instant = parse_datetime(value)
+    return instant, instant
+
+
+class _ItemContext:
+    """Item that is being evaluated, caching the values derived from it."""
+    __slots__ = ("item", "_geometry", "_temporal")
+
+    def __init__(self, item: Item):
+        self.item = item
+        self._geometry: Optional[BaseGeometry] = None
+        self._temporal: Dict[str, Any] = {}
+
+    def get(self, name: str) -> Any:
+        if name in ("id", "collection"):
+            return self.item.get(name)
+        if name == "geometry":
+            return self.geometry()
+        return self.item.get("properties", {}).get(name)
+
+    def geometry(self) -> Optional[BaseGeometry]:
+        if self._geometry is None and self.item.get("geometry") is not None:
+            self._geometry = shape(self.item["geometry"])
+        return self._geometry
+
+    def instant(self, name: str) -> Optional[datetime]:
+        key = f"instant:{name}"
+        if key not in self._temporal:
+            interval = self.interval(name)
+            self._temporal[key] = interval[0] if interval is not None else None
+        return self._temporal[key]
+
+    def interval(self, name: str) -> Optional[Interval]:
+        if name not in self._temporal:
+            properties = self.item.get("properties", {})
+            try:
+                if name == "datetime" and properties.get("start_datetime") is not None:
+                    # the temporal extent of an item is given by its start and end datetime, if available
+                    interval = (
+                        parse_datetime(properties["start_datetime"]),
+                        parse_datetime(properties.get("end_datetime") or properties["start_datetime"])
+                    )
+                else:
+                    interval = _parse_interval(self.get(name))
+            except ValueError:
+                # values that are not a valid datetime cannot be compared
+                interval = None
+            self._temporal[name] = interval
+        return self._temporal[name]
+
+
+def _property_name(node: dict) -> str:
+    name = node["property"]
+    return name[len("properties."):] if name.startswith("properties.") else name
+
+
+def _is_temporal_literal(node: Any) -> bool:
+    return isinstance(node, dict) and ("timestamp" in node or "date" in node or "interval" in node)
+
+
+def _is_geometry_literal(node: Any) -> bool:
+    return isinstance(node, dict) and ("bbox" in node or "coordinates" in node or "geometries" in node)
+
+
+def _constant(value: Any) -> Getter:
+    return lambda ctx: value
+
+
+def _compile_value(node: Any) -> Getter:
+    """Compiles a scalar expression, literal values are converted once here instead of for every item."""
+    if isinstance(node, dict):
+        if "property" in node:
+            name = _property_name(node)
+            return lambda ctx: ctx.get(name)
+        if "timestamp" in node or "date" in node:
+            return _constant(parse_datetime(node.get("timestamp", node.get("date"))))
+        if _is_geometry_literal(node):
+            return _constant(_geometry_literal(node))
+        if "op" in node:
+            if node["op"] in ("casei", "accenti") and len(node["args"]) == 1:
+                # case and accent insensitive comparisons are approximated by a case insensitive comparison
+                getter = _compile_value(node["args"][0])
+
+                def insensitive(ctx):
+                    value = getter(ctx)
+                    return value.lower() if isinstance(value, str) else value
+
+                return insensitive
+            raise ValueError(f"function {node['op']} is not supported")
+        raise ValueError(f"unsupported expression {node}")
+    if isinstance(node, list):
+        getters = [_compile_value(n) for n in node]
+        return lambda ctx: [g(ctx) for g in getters]
+    return _constant(node)
+
+
+def _compile_temporal_value(node: Any) -> Getter:
+    """Compiles an instant expression, used when comparing to a timestamp or date."""
+    if isinstance(node, dict) and "property" in node:
+        name = _property_name(node)
+        return lambda ctx: ctx.instant(name)
+    if isinstance(node, str):
+        return _constant(parse_datetime(node))
+    return _compile_value(node)
+
+
+def _compile_interval(node: Any) -> Callable[["_ItemContext"], Optional[Interval]]:
+    """Compiles an expression that evaluates to a time interval, an instant is an interval of zero length."""
+    if isinstance(node, dict) and "property" in node:
+        name = _property_name(node)
+        return lambda ctx: ctx.interval(name)
+    if isinstance(node, dict) and "interval" in node:
+        start, end = node["interval"]
+        return _constant((parse_datetime(start) or _MIN_DATETIME, parse_datetime(end) or _MAX_DATETIME))
+    if isinstance(node, dict) and ("timestamp" in node or "date" in node):
+        instant = parse_datetime(node.get("timestamp", node.get("date")))
+        return _constant((instant, instant))
+    raise ValueError(f"unsupported temporal expression {node}")
+
+
+def _geometry_literal(node: dict) -> BaseGeometry:
+    try:
+        if "bbox" in node:
+            bbox = node["bbox"]
+            if len(bbox) == 6:
+                bbox = [bbox[0], bbox[1], bbox[3], bbox[4]]
+            return box(*bbox)
+        return shape(node)
+    except Exception as e:
+        raise ValueError(f"invalid geometry {node}: {e}")
+
+
+def _compile_geometry(node: Any) -> Callable[["_ItemContext"], Optional[BaseGeometry]]:
+    if isinstance(node, dict) and "property" in node:
+        name = _property_name(node)
+        if name == "geometry":
+            return lambda ctx: ctx.geometry()
+        return lambda ctx: shape(ctx.get(name)) if ctx.get(name) is not None else None
+    if _is_geometry_literal(node):
+        return _constant(_geometry_literal(node))
+    raise ValueError(f"unsupported spatial expression {node}")
+
+
+def _like_pattern(pattern: str) -> "re.Pattern":
+    regex = ""
+    escaped = False
+    for character in pattern:
+        if escaped:
+            regex += re.escape(character)
+            escaped = False
+        elif character == "\\":
+            escaped = True
+        elif character == "%":
+            regex += ".*"
+        elif character == "_":
+            regex += "."
+        else:
+            regex += re.escape(character)
+    return re.compile(regex, re.DOTALL)
+
+
+_COMPARISONS = {
+    "=": lambda a, b: a == b,
+    "<>": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+_SPATIAL_OPERATORS = {
+    "s_intersects": lambda a, b: a.intersects(b),
+    "s_equals": lambda a, b: a.equals(b),
+    "s_disjoint": lambda a, b: a.disjoint(b),
+    "s_touches": lambda a, b: a.touches(b),
+    "s_within": lambda a, b: a.within(b),
+    "s_overlaps": lambda a, b: a.overlaps(b),
+    "s_crosses": lambda a, b: a.crosses(b),
+    "s_contains": lambda a, b: a.contains(b),
+}
+
+_TEMPORAL_OPERATORS = {
+    "t_intersects": lambda a, b: a[0] <= b[1] and b[0] <= a[1],
+    "t_disjoint": lambda a, b: a[1] < b[0] or b[1] < a[0],
+    "t_equals": lambda a, b: a[0] == b[0] and a[1] == b[1],
+    "t_before": lambda a, b: a[1] < b[0],
+    "t_after": lambda a, b: a[0] > b[1],
+    "t_meets": lambda a, b: a[1] == b[0],
+    "t_metby": lambda a, b: a[0] == b[1],
+    "t_overlaps": lambda a, b: a[0] < b[0] < a[1] < b[1],
+    "t_overlappedby": lambda a, b: b[0] < a[0] < b[1] < a[1],
+    "t_starts": lambda a, b: a[0] == b[0] and a[1] < b[1],
+    "t_startedby": lambda a, b: a[0] == b[0] and a[1] > b[1],
+    "t_during": lambda a, b: b[0] <= a[0] and a[1] <= b[1],
+    "t_contains": lambda a, b: a[0] <= b[0] and b[1] <= a[1],
+    "t_finishes": lambda a, b: a[1] == b[1] and a[0] > b[0],
+    "t_finishedby": lambda a, b: a[1] == b[1] and a[0] < b[0],
+}
+
+
+def _binary(compare: Callable[[Any, Any], bool], left: Getter, right: Getter) -> Predicate:
+    def predicate(ctx):
+        a = left(ctx)
+        if a is None:
+            return None
+        b = right(ctx)
+        if b is None:
+            return None
+        try:
+            return compare(a, b)
+        except TypeError:
+            # values of incompatible types cannot be compared
+            return None
+
+    return predicate
+
+
+def _compile(node: Any) -> Predicate:
+    if isinstance(node, bool):
+        return _constant(node)
+    if not isinstance(node, dict) or "op" not in node:
+        raise ValueError(f"expected a predicate, found {node}")
+
+    op = node["op"]
+    args = node.get("args", [])
+
+    if op in ("and", "or"):
+        predicates = [_compile(a) for a in args]
+        if op == "and":
+            def conjunction(ctx):
+                result = True
+                for p in predicates:
+                    value = p(ctx)
+                    if value is False:
+                        return False
+                    if value is None:
+                        result = None
+                return result
+
+            return conjunction
+
+        def disjunction(ctx):
+            result = False
+            for p in predicates:
+                value = p(ctx)
+                if value is True:
+                    return True
+                if value is None:
+                    result = None
+            return result
+
+        return disjunction
+
+    if op == "not":
+        (predicate,) = [_compile(a) for a in args]
+
+        def negation(ctx):
+            value = predicate(ctx)
+            return None if value is None else not value
+
+        return negation
+
+    if op in _COMPARISONS:
+        left, right = args
+        if _is_temporal_literal(left) or _is_temporal_literal(right):
+            return _binary(_COMPARISONS[op], _compile_temporal_value(left), _compile_temporal_value(right))
+        return _binary(_COMPARISONS[op], _compile_value(left), _compile_value(right))
+
+    if op == "like":
+        value, pattern = args
+        if not isinstance(pattern, str):
+            raise ValueError("the pattern of like must be a string")
+        regex = _like_pattern(pattern)
+        getter = _compile_value(value)
+
+        def like(ctx):
+            v = getter(ctx)
+            return None if v is None else regex.fullmatch(str(v)) is not None
+
+        return like
+
+    if op == "between":
+        value, lower, upper = args
+        temporal = _is_temporal_literal(lower) or _is_temporal_literal(upper)
+        compile_value = _compile_temporal_value if temporal else _compile_value
+        getter, lower_getter, upper_getter = compile_value(value), compile_value(lower), compile_value(upper)
+
+        def between(ctx):
+            v, lo, hi = getter(ctx), lower_getter(ctx), upper_getter(ctx)
+            if v is None or lo is None or hi is None:
+                return None
+            try:
+                return lo <= v <= hi
+            except TypeError:
+                return None
+
+        return between
+
+    if op == "in":
+        value, values = args
+        if not isinstance(values, list):
+            raise ValueError("in requires a list of values")
+        if all(not isinstance(v, (dict, list)) for v in values):
+            return _binary(lambda a, b: a in b, _compile_value(value), _constant(frozenset(values)))
+        return _binary(lambda a, b: a in b, _compile_value(value), _compile_value(values))
+
+    if op == "isNull":
+        (getter,) = [_compile_value(a) for a in args]
+        return lambda ctx: getter(ctx) is None
+
+    if op in _SPATIAL_OPERATORS:
+        left, right = args
+        return _binary(_SPATIAL_OPERATORS[op], _compile_geometry(left), _compile_geometry(right))
+
+    if op in _TEMPORAL_OPERATORS:
+        left, right = args
+        return _binary(_TEMPORAL_OPERATORS[op], _compile_interval(left), _compile_interval(right))
+
+    raise ValueError(f"operator {op} is not supported")
+
+
+def compile_filter(node: Any) -> Callable[[Item], bool]:
+    """
+    Compiles a CQL2 JSON filter to a predicate on STAC items.
+    The filter is translated once to nested functions, so evaluating an item does not walk the filter again.
+    Items for which the result is unknown, eg. because a property is missing, do not match.
+
+    :param node: CQL2 JSON filter
+    :return: predicate returning whether an item matches the filter
+    :raises ValueError: if the filter contains unsupported operators or invalid values
+    """
+    predicate = _compile(node)
+    return lambda item: predicate(_ItemContext(item)) is True
@@ -0,0 +1,241 @@
+import math
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from shapely.geometry import shape
+
+from opensearch_stac_adapter.dates import parse_datetime
+from opensearch_stac_adapter.query import queryable_property, predicate_value
+
+
+# CQL2 comparison operators, mapped to the operators of the query extension
+_QUERY_OPERATORS = {
+    "=": "eq",
+    "<": "lt",
+    "<=": "lte",
+    ">": "gt",
+    ">=": "gte",
+}
+_REVERSED_OPERATORS = {
+    "=": "=",
+    "<": ">",
+    "<=": ">=",
+    ">": "<",
+    ">=": "<=",
+}
+# item properties holding a timestamp
+_TEMPORAL_PROPERTIES = {"datetime", "start_datetime", "end_datetime", "created", "updated"}
+
+
+def _property_name(node: Any) -> Optional[str]:
+    if isinstance(node, dict) and "property" in node:
+        name = node["property"]
+        if not isinstance(name, str):
+            raise ValueError(f"property name must be a string, found {name!r}")
+        return name[len("properties."):] if name.startswith("properties.") else name
+    return None
+
+
+def _instant(value: Any) -> datetime:
+    """
+    Parses the value of a timestamp or date literal.
+
+    :raises ValueError: if the value is not a valid instant
+    """
+    try:
+        parsed = parse_datetime(value) if isinstance(value, str) else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"invalid timestamp or date {value!r}")
+    return parsed
+
+
+def _bbox(value: Any) -> List[float]:
+    """
+    Validates the value of a 2D bbox literal.
+
+    :raises ValueError: if the value is not a valid bbox
+    """
+    if not isinstance(value, list) or len(value) != 4 or not all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v) for v in value
+    ):
+        raise ValueError(f"invalid bbox {value!r}")
+    if value[0] > value[2] or value[1] > value[3]:
+        raise ValueError(f"invalid bbox {value!r}, the minimum exceeds the maximum")
+    return list(value)
+
+
+def _literal(node: Any) -> Optional[Tuple[Any, bool]]:
+    """
+    Get the value of a scalar literal as used by OpenSearch.
+
+    :return: tuple of the value and whether it is a timestamp or date, or `None` if the node is not a scalar literal
+    :raises ValueError: if a timestamp or date literal is invalid
+    """
+    if isinstance(node, dict):
+        if "timestamp" in node or "date" in node:
+            return _instant(node.get("timestamp", node.get("date"))), True
+        return None
+    if isinstance(node, (str, int, float)) and not isinstance(node, bool):
+        return node, False
+    return None
+
+
+def _spatial_params(node: dict) -> Optional[dict]:
+    """Translates `S_INTERSECTS(geometry, <literal>)` to the `geometry` or `bbox` parameter."""
+    left, right = node["args"]
+    if _property_name(left) != "geometry":
+        left, right = right, left
+    if _property_name(left) != "geometry" or not isinstance(right, dict):
+        return None
+    if "bbox" in right and isinstance(right["bbox"], list) and len(right["bbox"]) == 4:
+        return {"bbox": _bbox(right["bbox"])}
+    if "type" in right:
+        try:
+            return {"geometry": shape(right).wkt}
+        except Exception:
+            return None
+    return None
+
+
+def _temporal_params(node: dict) -> Optional[dict]:
+    """Translates `T_INTERSECTS(datetime, <literal>)` to the `start` and `end` parameters."""
+    left, right = node["args"]
+    if _property_name(left) != "datetime":
+        left, right = right, left
+    if _property_name(left) != "datetime" or not isinstance(right, dict):
+        return None
+    if "interval" in right:
+        if not isinstance(right["interval"], list) or len(right["interval"]) != 2:
+            raise ValueError("an interval requires a start and an end")
+        start, end = right["interval"]
+    elif "timestamp" in right or "date" in right:
+        start = end = right.get("timestamp", right.get("date"))
+    else:
+        return None
+    # the bounds are validated, but passed as is, so a date still covers the whole day
+    params = dict()
+    if start not in ("..", ""):
+        _instant(start)
+        params["start"] = start
+    if end not in ("..", ""):
+        _instant(end)
+        params["end"] = end
+    return params
+
+
+def _comparison(node: dict) -> Optional[Tuple[str, str, Any]]:
+    """
+    Normalizes a comparison of a property with a literal.
+
+    :return: tuple of property name, query extension operator and value, or `None`
+    """
+    op = node["op"]
+    args = node.get("args", [])
+    if op in _QUERY_OPERATORS and len(args) == 2:
+        left, right = args
+        if _property_name(left) is None:
+            left, right = right, left
+            op = _REVERSED_OPERATORS[op]
+        name, literal = _property_name(left), _literal(right)
+        if name is not None and literal is not None and _comparable(name, [literal]):
+            return name, _QUERY_OPERATORS[op], literal[0]
+    elif op == "in" and len(args) == 2 and isinstance(args[1], list):
+        name, literals = _property_name(args[0]), [_literal(v) for v in args[1]]
+        if name is not None and len(literals) > 0 and all(v is not None for v in literals) \
+                and _comparable(name, literals):
+            return name, "in", [value for value, _ in literals]
+    return None
+
+
+def _comparable(name: str, literals: List[Tuple[Any, bool]]) -> bool:
+    """Timestamp and date literals are only pushed down in comparisons with temporal properties."""
+    return name in _TEMPORAL_PROPERTIES or not any(temporal for _, temporal in literals)
+
+
+def split_filter(node: Any, query_params: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[dict]]:
+    """
+    Splits a CQL2 JSON filter in a part that is evaluated by the OpenSearch backend and a residual part that has to
+    be evaluated on the items.
+
+    Only the conjuncts of a top-level `AND` are considered for pushdown: intersections with the item geometry or
+    datetime, and comparisons on queryable properties. Conjuncts that would override a parameter of the search
+    request itself stay in the residual filter.
+
+    :param node: CQL2 JSON filter
+    :param query_params: OpenSearch query parameters of the search request
+    :return: tuple of additional OpenSearch query parameters and the residual filter, `None` if everything is pushed
+        down
+    :raises ValueError: if the filter is malformed
+    """
+    if isinstance(node, dict) and node.get("op") == "and":
+        conjuncts = node.get("args")
+        if not isinstance(conjuncts, list):
+            raise ValueError("arguments of and must be a list")
+    else:
+        conjuncts = [node]
+
+    params: Dict[str, Any] = dict()
+    residual: List[Any] = []
+    comparisons: Dict[str, List[Tuple[Any, str, Any]]] = OrderedDict()
+
+    def available(*names: str) -> bool:
+        return all(name not in query_params and name not in params for name in names)
+
+    for conjunct in conjuncts:
+        if not isinstance(conjunct, dict) or "op" not in conjunct:
+            residual.append(conjunct)
+            continue
+        op = conjunct["op"]
+        args = conjunct.get("args")
+        if not isinstance(args, list):
+            raise ValueError(f"arguments of {op} must be a list")
+
+        if op == "s_intersects" and len(args) == 2 and available("bbox", "geometry"):
+            spatial = _spatial_params(conjunct)
+            if spatial is not None:
+                params.update(spatial)
+                continue
+        if op == "t_intersects" and len(args) == 2 and available("start", "end"):
+            temporal = _temporal_params(conjunct)
+            if temporal is not None:
+                params.update(temporal)
+                continue
+        if op == "between" and len(args) == 3:
+            # a range on a single property is expressed as two comparisons
+            lower = _comparison({"op": ">=", "args": args[:2]})
+            upper = _comparison({"op": "<=", "args": [args[0], args[2]]})
+            if lower is not None and upper is not None:
+                comparisons.setdefault(lower[0], []).extend([(conjunct, lower[1], lower[2]), (None, upper[1], upper[2])])
+                continue
+
+        comparison = _comparison(conjunct)
+        if comparison is not None:
+            name, operator, value = comparison
+            comparisons.setdefault(name, []).append((conjunct, operator, value))
+        else:
+            residual.append(conjunct)
+
+    for name, predicates in comparisons.items():
+        conjuncts_of_property = [c for c, _, _ in predicates if c is not None]
+        prop = queryable_property(name)
+        pushed = False
+        if name == "id" and len(predicates) == 1 and predicates[0][1] == "eq" and available("uid"):
+            params["uid"] = str(predicates[0][2])
+            pushed = True
+        elif prop is not None and available(prop.parameter):
+            operators = [operator for _, operator, _ in predicates]
+            if len(set(operators)) == len(operators):
+                try:
+                    params[prop.parameter] = predicate_value(prop, {operator: value for _, operator, value in predicates})
+                    pushed = True
+                except ValueError:
+                    pass
+        if not pushed:
+            residual.extend(conjuncts_of_property)
+
+    if len(residual) == 0:
+        return params, None
+    return params, residual[0] if len(residual) == 1 else {"op": "and", "args": residual}
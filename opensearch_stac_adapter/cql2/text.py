@@ -0,0 +1,218 @@
+import re
+from typing import Any, List, NamedTuple
+
+import shapely.wkt
+from shapely.geometry import mapping
+
+
+class _Token(NamedTuple):
+    kind: str
+    value: str
+    start: int
+    end: int
+
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<whitespace>\s+)
+    |(?P<string>'(?:[^']|'')*')
+    |(?P<number>[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    |(?P<operator><>|<=|>=|=|<|>)
+    |(?P<punctuation>[(),\[\]])
+    |(?P<quoted_identifier>"(?:[^"]|"")*")
+    |(?P<identifier>[A-Za-z_][\w:.]*)
+    """,
+    re.VERBOSE
+)
+
+_GEOMETRY_TYPES = {
+    "POINT", "LINESTRING", "POLYGON", "MULTIPOINT", "MULTILINESTRING", "MULTIPOLYGON", "GEOMETRYCOLLECTION"
+}
+_COMPARISON_OPERATORS = {"=", "<>", "<", "<=", ">", ">="}
+
+
+def _tokenize(text: str) -> List[_Token]:
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN_PATTERN.match(text, position)
+        if match is None:
+            raise ValueError(f"unexpected character {text[position]!r} at position {position}")
+        if match.lastgroup != "whitespace":
+            tokens.append(_Token(match.lastgroup, match.group(), match.start(), match.end()))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser of CQL2 text, producing the equivalent CQL2 JSON."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.index = 0
+
+    def _peek(self, offset: int = 0) -> _Token:
+        index = self.index + offset
+        return self.tokens[index] if index < len(self.tokens) else _Token("end", "", len(self.text), len(self.text))
+
+    def _next(self) -> _Token:
+        token = self._peek()
+        if token.kind == "end":
+            raise ValueError("unexpected end of filter")
+        self.index += 1
+        return token
+
+    def _is_keyword(self, keyword: str, offset: int = 0) -> bool:
+        token = self._peek(offset)
+        return token.kind == "identifier" and token.value.upper() == keyword
+
+    def _accept_keyword(self, keyword: str) -> bool:
+        if self._is_keyword(keyword):
+            self.index += 1
+            return True
+        return False
+
+    def _expect(self, value: str) -> None:
+        token = self._next()
+        if token.value.upper() != value:
+            raise ValueError(f"expected {value!r} at position {token.start}, found {token.value!r}")
+
+    def parse(self) -> dict:
+        expression = self._or_expression()
+        token = self._peek()
+        if token.kind != "end":
+            raise ValueError(f"unexpected {token.value!r} at position {token.start}")
+        return expression
+
+    def _or_expression(self) -> dict:
+        args = [self._and_expression()]
+        while self._accept_keyword("OR"):
+            args.append(self._and_expression())
+        return args[0] if len(args) == 1 else {"op": "or", "args": args}
+
+    def _and_expression(self) -> dict:
+        args = [self._not_expression()]
+        while self._accept_keyword("AND"):
+            args.append(self._not_expression())
+        return args[0] if len(args) == 1 else {"op": "and", "args": args}
+
+    def _not_expression(self) -> dict:
+        if self._accept_keyword("NOT"):
+            return {"op": "not", "args": [self._not_expression()]}
+        return self._predicate()
+
+    def _predicate(self) -> Any:
+        if self._peek().value == "(":
+            self._next()
+            expression = self._or_expression()
+            self._expect(")")
+            return expression
+
+        left = self._scalar()
+        token = self._peek()
+        if token.kind == "operator" and token.value in _COMPARISON_OPERATORS:
+            self._next()
+            return {"op": token.value, "args": [left, self._scalar()]}
+
+        negate = self._accept_keyword("NOT")
+        if self._accept_keyword("LIKE"):
+            predicate = {"op": "like", "args": [left, self._scalar()]}
+        elif self._accept_keyword("BETWEEN"):
+            lower = self._scalar()
+            self._expect("AND")
+            predicate = {"op": "between", "args": [left, lower, self._scalar()]}
+        elif self._accept_keyword("IN"):
+            self._expect("(")
+            values = [self._scalar()]
+            while self._peek().value == ",":
+                self._next()
+                values.append(self._scalar())
+            self._expect(")")
+            predicate = {"op": "in", "args": [left, values]}
+        elif not negate and self._accept_keyword("IS"):
+            negate = self._accept_keyword("NOT")
+            self._expect("NULL")
+            predicate = {"op": "isNull", "args": [left]}
+        elif not negate and (isinstance(left, bool) or (isinstance(left, dict) and "op" in left)):
+            # boolean literal or function returning a boolean, eg. S_INTERSECTS(...)
+            return left
+        else:
+            raise ValueError(f"expected a predicate at position {token.start}, found {token.value!r}")
+
+        return {"op": "not", "args": [predicate]} if negate else predicate
+
+    def _scalar(self) -> Any:
+        token = self._next()
+        if token.kind == "string":
+            return token.value[1:-1].replace("''", "'")
+        if token.kind == "number":
+            return float(token.value) if re.search(r"[.eE]", token.value) else int(token.value)
+        if token.kind == "quoted_identifier":
+            return {"property": token.value[1:-1].replace('""', '"')}
+        if token.kind != "identifier":
+            raise ValueError(f"unexpected {token.value!r} at position {token.start}")
+
+        name = token.value.upper()
+        if name in ("TRUE", "FALSE"):
+            return name == "TRUE"
+        if name in _GEOMETRY_TYPES:
+            return self._geometry(token)
+        if self._peek().value != "(":
+            return {"property": token.value}
+
+        self._next()
+        args = []
+        if self._peek().value != ")":
+            args.append(self._scalar())
+            while self._peek().value == ",":
+                self._next()
+                args.append(self._scalar())
+        self._expect(")")
+
+        if name in ("TIMESTAMP", "DATE"):
+            if len(args) != 1 or not isinstance(args[0], str):
+                raise ValueError(f"{name} requires a single string argument")
+            return {name.lower(): args[0]}
+        if name == "INTERVAL":
+            if len(args) != 2:
+                raise ValueError("INTERVAL requires two arguments")
+            # the bounds of an interval are plain instant strings in CQL2 JSON
+            return {"interval": [a.get("timestamp", a.get("date", a)) if isinstance(a, dict) else a for a in args]}
+        if name == "BBOX":
+            return {"bbox": args}
+        return {"op": token.value.lower(), "args": args}
+
+    def _geometry(self, token: _Token) -> dict:
+        """Parses a WKT geometry literal, which spans up to its balanced closing parenthesis."""
+        depth = 0
+        end = None
+        for position in range(token.end, len(self.text)):
+            character = self.text[position]
+            if character == "(":
+                depth += 1
+            elif character == ")":
+                depth -= 1
+                if depth == 0:
+                    end = position + 1
+                    break
+        if end is None:
+            raise ValueError(f"unterminated geometry at position {token.start}")
+        try:
+            geometry = shapely.wkt.loads(self.text[token.start:end])
+        except Exception as e:
+            raise ValueError(f"invalid geometry at position {token.start}: {e}")
+        while self._peek().kind != "end" and self._peek().start < end:
+            self.index += 1
+        return dict(mapping(geometry))
+
+
+def parse_text(text: str) -> dict:
+    """
+    Parses a CQL2 text filter to its CQL2 JSON representation.
+
+    :param text: CQL2 text, eg. `eo:cloud_cover < 20 AND S_INTERSECTS(geometry, POINT(4.4 51.2))`
+    :return: CQL2 JSON filter
+    :raises ValueError: if the filter cannot be parsed
+    """
+    return _Parser(text).parse()
@@ -0,0 +1,25 @@
+import re
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+
+_FRACTION_PATTERN = re.compile(r"\.(\d+)")
+
+
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """
+    Parses an RFC 3339 timestamp or date. Values without a timezone are considered UTC.
+
+    :param value: timestamp or date string
+    :return: timezone-aware datetime, or `None` for an open bound (`..`)
+    :raises ValueError: if the value cannot be parsed
+    """
+    if isinstance(value, datetime):
+        return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+    if value is None or value in ("..", ""):
+        return None
+    value = str(value).strip().replace("Z", "+00:00").replace("z", "+00:00")
+    # datetime.fromisoformat only accepts fractions of 3 or 6 digits
+    value = _FRACTION_PATTERN.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), value)
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
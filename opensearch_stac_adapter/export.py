@@ -0,0 +1,210 @@
+import abc
+import attr
+import io
+import json
+from enum import Enum
+from typing import List, Dict, Any
+
+from shapely.geometry import shape
+from stac_fastapi.types.stac import Item
+
+
+class ExportFormat(str, Enum):
+    """Supported formats of a collection export."""
+    ndjson = "ndjson"
+    parquet = "parquet"
+    arrow = "arrow"
+
+
+class ItemWriter(abc.ABC):
+    """
+    Serializes items incrementally.
+    Every call returns the bytes that are ready to be sent, so a response can be streamed while it is being generated.
+    """
+    media_type: str
+    file_extension: str
+
+    @abc.abstractmethod
+    def write(self, items: List[Item]) -> bytes:
+        """
+        Serialize a batch of items.
+
+        :param items: STAC items
+        :return: serialized bytes
+        """
+        pass
+
+    def close(self) -> bytes:
+        """
+        Finish the output.
+
+        :return: remaining serialized bytes
+        """
+        return b""
+
+
+class NDJSONItemWriter(ItemWriter):
+    """Writes items as newline-delimited GeoJSON, one item per line."""
+    media_type = "application/x-ndjson"
+    file_extension = "ndjson"
+
+    def write(self, items: List[Item]) -> bytes:
+        return "".join(json.dumps(item, separators=(",", ":")) + "\n" for item in items).encode("utf-8")
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Write-only file object of which the written bytes can be drained while its position keeps increasing."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# item properties that are stored as separate columns with their pyarrow type, other properties are not exported
+PROPERTY_COLUMNS = {
+    "datetime": "string",
+    "start_datetime": "string",
+    "end_datetime": "string",
+    "created": "string",
+    "updated": "string",
+    "title": "string",
+    "platform": "string",
+    "eo:cloud_cover": "float64",
+    "sat:orbit_state": "string",
+    "sat:relative_orbit": "int64",
+    "product:type": "string",
+    "grid:code": "string",
+}
+
+
+@attr.s
+class _ArrowItemWriter(ItemWriter):
+    """
+    Base class for columnar writers based on pyarrow.
+    Items are laid out following the STAC-geoparquet conventions: the geometry is WKB encoded, the item properties are
+    top-level columns and the assets and links are JSON encoded. Date and time values are kept as ISO 8601 strings.
+    """
+    _buffer: _StreamBuffer = attr.ib(init=False, factory=_StreamBuffer)
+
+    def __attrs_post_init__(self):
+        try:
+            import pyarrow
+        except ImportError:
+            raise RuntimeError("pyarrow must be installed in order to export to a columnar format")
+
+        self._pa = pyarrow
+        self._schema = pyarrow.schema(
+            [
+                ("type", pyarrow.string()),
+                ("stac_version", pyarrow.string()),
+                ("id", pyarrow.string()),
+                ("geometry", pyarrow.binary()),
+                ("bbox", pyarrow.list_(pyarrow.float64())),
+                ("collection", pyarrow.string()),
+                *[(p, getattr(pyarrow, t)()) for p, t in PROPERTY_COLUMNS.items()],
+                ("assets", pyarrow.string()),
+                ("links", pyarrow.string()),
+            ],
+            metadata={
+                "geo": json.dumps({
+                    "version": "1.0.0",
+                    "primary_column": "geometry",
+                    "columns": {
+                        "geometry": {
+                            "encoding": "WKB",
+                            "geometry_types": []
+                        }
+                    }
+                })
+            }
+        )
+
+    def _to_row(self, item: Item) -> Dict[str, Any]:
+        properties = item.get("properties", {})
+        return {
+            "type": item.get("type"),
+            "stac_version": item.get("stac_version"),
+            "id": item.get("id"),
+            "geometry": shape(item["geometry"]).wkb if item.get("geometry") else None,
+            "bbox": item.get("bbox"),
+            "collection": item.get("collection"),
+            **{p: properties.get(p) for p in PROPERTY_COLUMNS},
+            "assets": json.dumps(item.get("assets", {})),
+            "links": json.dumps(item.get("links", [])),
+        }
+
+    def _to_table(self, items: List[Item]):
+        return self._pa.Table.from_pylist([self._to_row(item) for item in items], schema=self._schema)
+
+
+@attr.s
+class ParquetItemWriter(_ArrowItemWriter):
+    """Writes items as a GeoParquet file, with one row group per batch of items."""
+    media_type = "application/vnd.apache.parquet"
+    file_extension = "parquet"
+
+    def __attrs_post_init__(self):
+        super().__attrs_post_init__()
+        import pyarrow.parquet
+        self._writer = pyarrow.parquet.ParquetWriter(self._buffer, self._schema)
+
+    def write(self, items: List[Item]) -> bytes:
+        if len(items) > 0:
+            self._writer.write_table(self._to_table(items))
+        return self._buffer.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._buffer.drain()
+
+
+@attr.s
+class ArrowItemWriter(_ArrowItemWriter):
+    """Writes items in the Arrow IPC streaming format, with one record batch per batch of items."""
+    media_type = "application/vnd.apache.arrow.stream"
+    file_extension = "arrows"
+
+    def __attrs_post_init__(self):
+        super().__attrs_post_init__()
+        self._writer = self._pa.ipc.new_stream(self._buffer, self._schema)
+
+    def write(self, items: List[Item]) -> bytes:
+        if len(items) > 0:
+            self._writer.write_table(self._to_table(items))
+        return self._buffer.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._buffer.drain()
+
+
+def get_item_writer(export_format: ExportFormat) -> ItemWriter:
+    """
+    Create a writer for the given export format.
+
+    :param export_format: export format
+    :return: item writer
+    """
+    if export_format == ExportFormat.parquet:
+        return ParquetItemWriter()
+    elif export_format == ExportFormat.arrow:
+        return ArrowItemWriter()
+    return NDJSONItemWriter()
@@ -0,0 +1,3 @@
+from opensearch_stac_adapter.extensions.bulk_items import BulkItemsExtension
+from opensearch_stac_adapter.extensions.export import ExportExtension
+from opensearch_stac_adapter.extensions.metrics import MetricsExtension
@@ -0,0 +1,54 @@
+import attr
+from typing import List, Optional
+
+from fastapi import APIRouter, FastAPI, Body, Path
+from pydantic import BaseModel, conlist
+from starlette.requests import Request
+
+from stac_fastapi.types.extension import ApiExtension
+from stac_fastapi.types.core import AsyncBaseCoreClient
+
+
+MAX_BULK_ITEMS = 1000
+
+
+class BulkItemIds(BaseModel):
+    """Identifiers of the items to retrieve in bulk."""
+    ids: conlist(str, min_items=1, max_items=MAX_BULK_ITEMS)
+
+
+@attr.s
+class BulkItemsExtension(ApiExtension):
+    """
+    Bulk item retrieval extension.
+
+    Adds the `POST /collections/{collectionId}/bulk-items` endpoint, which returns the requested items of a collection
+    as a single FeatureCollection. The collection is validated once and the items are resolved concurrently.
+    """
+
+    client: AsyncBaseCoreClient = attr.ib()
+    conformance_classes: List[str] = attr.ib(factory=list)
+    schema_href: Optional[str] = attr.ib(default=None)
+
+    def register(self, app: FastAPI) -> None:
+        """
+        Register the extension with a FastAPI application.
+
+        :param app: target FastAPI application
+        """
+        router = APIRouter()
+
+        async def bulk_items(
+                request: Request,
+                collectionId: str = Path(..., description="Collection ID"),
+                body: BulkItemIds = Body(...)
+        ):
+            return await self.client.get_items(collection_id=collectionId, ids=body.ids, request=request)
+
+        router.add_api_route(
+            name="Bulk Get Items",
+            path="/collections/{collectionId}/bulk-items",
+            methods=["POST"],
+            endpoint=bulk_items
+        )
+        app.include_router(router, tags=["Bulk Items Extension"])
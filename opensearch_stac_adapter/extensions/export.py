@@ -0,0 +1,55 @@
+import attr
+from typing import List, Optional
+
+from fastapi import APIRouter, FastAPI, Path, Query
+from starlette.requests import Request
+
+from stac_fastapi.types.extension import ApiExtension
+from stac_fastapi.types.core import AsyncBaseCoreClient
+
+from opensearch_stac_adapter.export import ExportFormat
+
+
+@attr.s
+class ExportExtension(ApiExtension):
+    """
+    Collection export extension.
+
+    Adds the `GET /collections/{collectionId}/export` endpoint, which streams all items of a collection (optionally
+    filtered on bbox and datetime) as newline-delimited GeoJSON, GeoParquet or an Arrow IPC stream.
+    """
+
+    client: AsyncBaseCoreClient = attr.ib()
+    conformance_classes: List[str] = attr.ib(factory=list)
+    schema_href: Optional[str] = attr.ib(default=None)
+
+    def register(self, app: FastAPI) -> None:
+        """
+        Register the extension with a FastAPI application.
+
+        :param app: target FastAPI application
+        """
+        router = APIRouter()
+
+        async def export(
+                request: Request,
+                collectionId: str = Path(..., description="Collection ID"),
+                bbox: Optional[str] = Query(None),
+                datetime: Optional[str] = Query(None),
+                format: ExportFormat = Query(ExportFormat.ndjson)
+        ):
+            return await self.client.export_items(
+                id=collectionId,
+                bbox=bbox.split(",") if bbox else bbox,
+                datetime=datetime,
+                format=format,
+                request=request
+            )
+
+        router.add_api_route(
+            name="Export Items",
+            path="/collections/{collectionId}/export",
+            methods=["GET"],
+            endpoint=export
+        )
+        app.include_router(router, tags=["Export Extension"])
@@ -0,0 +1,41 @@
+import attr
+from typing import List, Optional
+
+from fastapi import APIRouter, FastAPI
+from starlette.requests import Request
+
+from stac_fastapi.types.extension import ApiExtension
+from stac_fastapi.types.core import AsyncBaseCoreClient
+
+
+@attr.s
+class MetricsExtension(ApiExtension):
+    """
+    Paging metrics extension.
+
+    Adds the `GET /metrics` endpoint, which reports the number of backend requests needed to serve the search pages
+    and the state of the product buffer.
+    """
+
+    client: AsyncBaseCoreClient = attr.ib()
+    conformance_classes: List[str] = attr.ib(factory=list)
+    schema_href: Optional[str] = attr.ib(default=None)
+
+    def register(self, app: FastAPI) -> None:
+        """
+        Register the extension with a FastAPI application.
+
+        :param app: target FastAPI application
+        """
+        router = APIRouter()
+
+        async def metrics(request: Request):
+            return await self.client.get_metrics(request=request)
+
+        router.add_api_route(
+            name="Paging Metrics",
+            path="/metrics",
+            methods=["GET"],
+            endpoint=metrics
+        )
+        app.include_router(router, tags=["Metrics Extension"])
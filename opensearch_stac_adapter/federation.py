@@ -0,0 +1,264 @@
+import attr
+import configparser
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from stac_fastapi.types.errors import DatabaseError
+from terracatalogueclient import Catalogue
+from terracatalogueclient.config import CatalogueConfig
+import terracatalogueclient
+
+logger = logging.getLogger(__name__)
+
+
+class BackendUnavailableError(DatabaseError):
+    """Raised when a backend of a federation does not respond in time or has too many requests in flight."""
+    pass
+
+
+@attr.s
+class CatalogueBackend:
+    """
+    OpenSearch catalogue that is part of a federation.
+    Requests are executed by a thread pool of the backend itself, so a slow backend cannot hold up the requests to
+    the other backends. Requests to a busy backend wait for a request in flight to finish, within the timeout of the
+    backend, except for the requests sent to all backends, which skip a busy backend.
+    """
+    name: str = attr.ib()  # unique name of the backend
+    catalogue: Catalogue = attr.ib()
+    timeout: float = attr.ib(default=10.0)  # seconds to wait for a response of the backend
+    max_concurrent_requests: int = attr.ib(default=8)  # maximum number of requests in flight
+    _executor: ThreadPoolExecutor = attr.ib(init=False)
+    _slots: threading.BoundedSemaphore = attr.ib(init=False)
+
+    @_executor.default
+    def _default_executor(self) -> ThreadPoolExecutor:
+        # every request in flight has a thread, requests never wait in the queue of the executor
+        return ThreadPoolExecutor(max_workers=self.max_concurrent_requests, thread_name_prefix=f"backend-{self.name}")
+
+    @_slots.default
+    def _default_slots(self) -> threading.BoundedSemaphore:
+        return threading.BoundedSemaphore(self.max_concurrent_requests)
+
+    def submit(self, request: Callable[[Catalogue], Any], timeout: float = 0.0) -> Future:
+        """
+        Start a request to the backend.
+
+        :param request: function that executes the request on the catalogue
+        :param timeout: seconds to wait for one of the requests in flight to finish if the backend has
+            `max_concurrent_requests` requests in flight, by default the request fails immediately
+        :return: future of the response
+        :raises BackendUnavailableError: if the backend has too many requests in flight, eg. because it hangs
+        """
+        acquired = self._slots.acquire(timeout=timeout) if timeout > 0 else self._slots.acquire(blocking=False)
+        if not acquired:
+            raise BackendUnavailableError(f"Catalogue {self.name} has too many requests in flight.")
+        try:
+            future = self._executor.submit(request, self.catalogue)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._request_done)
+        return future
+
+    def _request_done(self, future: Future) -> None:
+        self._slots.release()
+
+    def call(self, request: Callable[[Catalogue], Any]) -> Any:
+        """
+        Execute a request to the backend, waiting at most `timeout` seconds, including the time it waits for the
+        requests in flight if the backend is busy.
+
+        :param request: function that executes the request on the catalogue
+        :return: response
+        :raises BackendUnavailableError: if the backend is unavailable or does not respond in time
+        """
+        started = time.monotonic()
+        future = self.submit(request, timeout=self.timeout)
+        try:
+            return future.result(timeout=max(0.0, self.timeout - (time.monotonic() - started)))
+        except FutureTimeoutError:
+            raise BackendUnavailableError(f"Catalogue {self.name} did not respond within {self.timeout} seconds.")
+
+
+@attr.s
+class FederatedCatalogue:
+    """
+    Federation of multiple OpenSearch catalogues, which exposes the same search interface as a single `Catalogue`.
+
+    Collections are routed to the backend that owns them. Static routes take precedence, other collections are routed
+    to the first backend, in order of registration, that lists them. Requests that are not bound to a collection are
+    sent to all backends concurrently. A backend that fails or does not respond within its timeout does not delay the
+    response: its last complete listing of collections is used instead, so a short outage does not change the list of
+    all collections. Requests that are routed to a single backend fail with a
+    `BackendUnavailableError` when the backend does not respond within its timeout.
+    """
+    backends: List[CatalogueBackend] = attr.ib()
+    routes: Dict[str, str] = attr.ib(factory=dict)  # static routes of collection ID to backend name
+    _routing_table: Dict[str, str] = attr.ib(init=False, factory=dict)  # discovered routes
+    # last complete listing of the collections of every backend, by backend name
+    _listings: Dict[str, List[terracatalogueclient.Collection]] = attr.ib(init=False, factory=dict)
+    _lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
+
+    @backends.validator
+    def _check_backends(self, attribute, value):
+        if len(value) == 0:
+            raise ValueError("A federation requires at least one backend.")
+        names = [backend.name for backend in value]
+        if len(set(names)) != len(names):
+            raise ValueError("Backend names must be unique.")
+
+    @routes.validator
+    def _check_routes(self, attribute, value):
+        names = {backend.name for backend in self.backends}
+        unknown = set(value.values()) - names
+        if len(unknown) > 0:
+            raise ValueError(f"Routes refer to unknown backends: {', '.join(sorted(unknown))}.")
+
+    @classmethod
+    def from_file(cls, path: str) -> "FederatedCatalogue":
+        """
+        Create a federation from a configuration file.
+        Every section of the file configures a backend, named after the section, with the following options:
+
+        - `Config`: path of the terracatalogueclient configuration file, the Terrascope catalogue is used by default
+        - `Timeout`: seconds to wait for a response of the backend
+        - `MaxConcurrentRequests`: maximum number of requests in flight to the backend
+        - `Collections`: comma-separated list of collections that are statically routed to the backend
+
+        :param path: path of the .ini configuration file
+        :return: federated catalogue
+        """
+        config = configparser.ConfigParser()
+        if len(config.read(path)) == 0:
+            raise ValueError(f"Federation configuration {path} cannot be read.")
+
+        backends = []
+        routes = dict()
+        for name in config.sections():
+            section = config[name]
+            catalogue_config = CatalogueConfig.from_file(section["Config"]) if "Config" in section else None
+            backends.append(CatalogueBackend(
+                name,
+                Catalogue(catalogue_config),
+                timeout=section.getfloat("Timeout", 10.0),
+                max_concurrent_requests=section.getint("MaxConcurrentRequests", 8)
+            ))
+            for collection in section.get("Collections", "").split(","):
+                if collection.strip():
+                    routes[collection.strip()] = name
+        return cls(backends=backends, routes=routes)
+
+    def backend(self, collection: str) -> CatalogueBackend:
+        """
+        Get the backend that owns a collection.
+        Collections that have not been discovered yet are looked up on all backends. Unknown collections are routed
+        to the first backend, which reports them as not found.
+
+        :param collection: collection ID
+        :return: backend
+        """
+        name = self._route(collection)
+        if name is None:
+            self.get_collections(uid=collection)
+            name = self._route(collection)
+        return self._backend_by_name(name) if name is not None else self.backends[0]
+
+    def _route(self, collection: str) -> Optional[str]:
+        with self._lock:
+            return self.routes.get(collection, self._routing_table.get(collection))
+
+    def _backend_by_name(self, name: str) -> CatalogueBackend:
+        return next(backend for backend in self.backends if backend.name == name)
+
+    def _fan_out(self, request: Callable[[Catalogue], Any]) -> List[Tuple[CatalogueBackend, Any]]:
+        """
+        Send a request to all backends concurrently.
+
+        :param request: function that executes the request on a catalogue
+        :return: responses of the backends that answered in time, in order of registration
+        """
+        started = time.monotonic()
+        futures: List[Tuple[CatalogueBackend, Future]] = []
+        for backend in self.backends:
+            try:
+                futures.append((backend, backend.submit(request)))
+            except BackendUnavailableError as e:
+                logger.warning(str(e))
+
+        responses = []
+        for backend, future in futures:
+            # all backends are queried at the same time, so every timeout is relative to the start of the fan-out
+            remaining = max(0.0, backend.timeout - (time.monotonic() - started))
+            try:
+                responses.append((backend, future.result(timeout=remaining)))
+            except FutureTimeoutError:
+                logger.warning(f"Catalogue {backend.name} did not respond within {backend.timeout} seconds.")
+            except Exception as e:
+                logger.warning(f"Catalogue {backend.name} failed: {e}")
+        return responses
+
+    def get_collections(self, **kwargs) -> Iterator[terracatalogueclient.Collection]:
+        """
+        Get the collections of all backends.
+        A request for a single, routed collection is only sent to the owning backend.
+
+        :param kwargs: OpenSearch query parameters
+        :return: collections, without duplicates
+        """
+        uid = kwargs.get("uid")
+        name = self._route(uid) if uid is not None else None
+        if name is not None:
+            return iter(self._backend_by_name(name).call(lambda catalogue: list(catalogue.get_collections(**kwargs))))
+
+        responses = dict(
+            (backend.name, response)
+            for backend, response in self._fan_out(lambda catalogue: list(catalogue.get_collections(**kwargs)))
+        )
+        # collections listed by multiple backends, eg. mirrors, are returned once, from the owning backend
+        listings: Dict[str, Dict[str, terracatalogueclient.Collection]] = OrderedDict()
+        for backend in self.backends:
+            response = responses.get(backend.name)
+            if len(kwargs) == 0:
+                with self._lock:
+                    if response is not None:
+                        self._listings[backend.name] = response
+                    else:
+                        response = self._listings.get(backend.name)
+            for collection in response or []:
+                listings.setdefault(collection.id, OrderedDict())[backend.name] = collection
+
+        owners: Dict[str, str] = dict()
+        for collection_id, listing in listings.items():
+            route = self.routes.get(collection_id)
+            owners[collection_id] = route if route in listing else next(iter(listing))
+        with self._lock:
+            self._routing_table.update(owners)
+        return iter([listings[collection_id][owner] for collection_id, owner in owners.items()])
+
+    def get_products(self, collection: str, **kwargs) -> Iterator[terracatalogueclient.Product]:
+        """
+        Get the products of a collection from the owning backend.
+
+        :param collection: collection ID
+        :param kwargs: OpenSearch query parameters
+        :return: products
+        :raises BackendUnavailableError: if the backend does not respond in time
+        """
+        return iter(self.backend(collection).call(lambda catalogue: list(catalogue.get_products(collection, **kwargs))))
+
+    def get_product_count(self, collection: str, **kwargs) -> int:
+        """
+        Get the number of products of a collection from the owning backend.
+
+        :param collection: collection ID
+        :param kwargs: OpenSearch query parameters
+        :return: number of products
+        :raises BackendUnavailableError: if the backend does not respond in time
+        """
+        return self.backend(collection).call(lambda catalogue: catalogue.get_product_count(collection, **kwargs))
@@ -0,0 +1,46 @@
+import attr
+import base64
+import json
+from typing import List, Optional, Tuple
+
+
+@attr.s
+class PagingToken:
+    """
+    Position of a search in the paged results.
+    The token is serialized as URL-safe base64 encoded JSON, clients should treat it as an opaque string.
+    """
+    collection: str = attr.ib()  # collection of the next page
+    start_index: int = attr.ib()  # index of the first product of the next page in the collection, starting at 1
+    hit_count: int = attr.ib()  # number of products in the collection matching the query
+    sortby: str = attr.ib(default="")  # OpenSearch sort keys the token was created with
+    # collections that follow with their hit count, planned when the search did not specify the collections
+    # the collections are indexes in the cached collection list, identified by its digest, to keep the token short
+    plan: Optional[List[Tuple[int, int]]] = attr.ib(default=None)
+    plan_digest: str = attr.ib(default="")
+
+    def __str__(self) -> str:
+        data = json.dumps(attr.asdict(self), separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(data).decode("ascii")
+
+    @classmethod
+    def parse(cls, token: str) -> "PagingToken":
+        """
+        Parse a serialized paging token.
+
+        :param token: serialized token
+        :return: paging token
+        :raises ValueError: if the token is invalid
+        """
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+            return cls(
+                collection=str(data["collection"]),
+                start_index=int(data["start_index"]),
+                hit_count=int(data["hit_count"]),
+                sortby=str(data.get("sortby", "")),
+                plan=[(int(i), int(n)) for i, n in data["plan"]] if data.get("plan") is not None else None,
+                plan_digest=str(data.get("plan_digest", ""))
+            )
+        except (TypeError, KeyError, ValueError) as e:
+            raise ValueError(f"Invalid token: {token}") from e
@@ -1,9 +1,35 @@
+import attr
 from stac_pydantic.api import Search
-from typing import Optional
+from typing import Optional, List, Dict, Any, Union
+from pydantic import Field
+from fastapi import Query
 from stac_pydantic.api.extensions.fields import FieldsExtension
+from stac_pydantic.api.extensions.sort import SortExtension
+from stac_fastapi.api.models import SearchGetRequest
 
 
 class AdaptedSearch(Search):
     """Search model"""
     token: Optional[str] = None
     field: Optional[FieldsExtension] = None
+    sortby: Optional[List[SortExtension]] = None
+    query: Optional[Dict[str, Dict[str, Any]]] = None
+    filter: Optional[Union[Dict[str, Any], str]] = None
+    filter_lang: Optional[str] = Field(None, alias="filter-lang")
+
+    class Config:
+        allow_population_by_field_name = True
+
+
+@attr.s
+class AdaptedSearchGetRequest(SearchGetRequest):
+    """GET search request, including the parameters of the filter extension."""
+    filter: Optional[str] = attr.ib(default=None)
+    filter_lang: Optional[str] = attr.ib(default=Query(None, alias="filter-lang"))
+
+    def kwargs(self) -> Dict:
+        return {
+            **super().kwargs(),
+            "filter": self.filter,
+            "filter_lang": self.filter_lang,
+        }
@@ -0,0 +1,66 @@
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+import shapely.wkt
+from shapely.geometry import box
+
+from opensearch_stac_adapter.dates import parse_datetime
+
+
+# margin on the temporal extent of a collection, as its bounds are often dates rather than timestamps
+_TEMPORAL_MARGIN = timedelta(days=1)
+
+
+def _spatial_extent_intersects(extent: Dict[str, Any], query_params: Dict[str, Any]) -> bool:
+    bboxes = extent.get("spatial", {}).get("bbox") or []
+    if len(bboxes) == 0 or bboxes[0] is None or len(bboxes[0]) != 4:
+        return True
+    min_x, min_y, max_x, max_y = bboxes[0]
+    if min_x > max_x:
+        # extent crossing the antimeridian, not pruned
+        return True
+    collection_box = box(min_x, min_y, max_x, max_y)
+
+    if "bbox" in query_params:
+        bbox = query_params["bbox"]
+        # 3D bounding boxes list the minimum and maximum coordinates after each other
+        query_box = box(bbox[0], bbox[1], bbox[3], bbox[4]) if len(bbox) == 6 else box(*bbox)
+        if not collection_box.intersects(query_box):
+            return False
+    if "geometry" in query_params:
+        if not collection_box.intersects(shapely.wkt.loads(query_params["geometry"])):
+            return False
+    return True
+
+
+def _temporal_extent_intersects(extent: Dict[str, Any], query_params: Dict[str, Any]) -> bool:
+    intervals = extent.get("temporal", {}).get("interval") or []
+    if len(intervals) == 0 or intervals[0] is None:
+        return True
+    collection_start, collection_end = (parse_datetime(v) for v in intervals[0])
+    start = parse_datetime(query_params.get("start"))
+    end = parse_datetime(query_params.get("end"))
+
+    if end is not None and collection_start is not None and end < collection_start - _TEMPORAL_MARGIN:
+        return False
+    if start is not None and collection_end is not None and start > collection_end + _TEMPORAL_MARGIN:
+        return False
+    return True
+
+
+def extent_intersects(extent: Optional[Dict[str, Any]], query_params: Dict[str, Any]) -> bool:
+    """
+    Checks whether a collection can contain products matching the spatial and temporal parameters of a query.
+    The check is conservative: a collection is only ruled out if its extent is known and does not intersect the query.
+
+    :param extent: STAC extent of the collection
+    :param query_params: OpenSearch query parameters
+    :return: `False` if the collection has no matching products
+    """
+    if extent is None:
+        return True
+    try:
+        return _spatial_extent_intersects(extent, query_params) and _temporal_extent_intersects(extent, query_params)
+    except (TypeError, ValueError, IndexError):
+        # malformed extents or query parameters are left to the backend
+        return True
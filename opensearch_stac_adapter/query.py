@@ -0,0 +1,154 @@
+import attr
+import math
+from typing import Any, Callable, Dict, Optional
+
+from stac_fastapi.types.errors import InvalidQueryParameter
+
+from opensearch_stac_adapter.dates import parse_datetime
+
+
+@attr.s(frozen=True)
+class QueryableProperty:
+    """STAC item property that can be filtered on by the OpenSearch backend."""
+    parameter: str = attr.ib()  # OpenSearch query parameter
+    ordered: bool = attr.ib(default=False)  # whether range comparisons are supported
+    converter: Callable[[Any], str] = attr.ib(default=str)  # converts a STAC value to the OpenSearch value
+
+
+def _to_number(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{value!r} is not a number")
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{value!r} is not a number")
+    if not math.isfinite(number):
+        raise ValueError(f"{value!r} is not a number")
+    return number
+
+
+def _format_number(value: Any) -> str:
+    number = _to_number(value)
+    return str(int(number)) if number.is_integer() else str(number)
+
+
+def _format_integer(value: Any) -> str:
+    number = _to_number(value)
+    if not number.is_integer():
+        raise ValueError(f"{value!r} is not an integer")
+    return str(int(number))
+
+
+def _format_datetime(value: Any) -> str:
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"{value!r} is not a datetime")
+    return parsed.isoformat()
+
+
+QUERYABLE_PROPERTIES: Dict[str, QueryableProperty] = {
+    "eo:cloud_cover": QueryableProperty("cloudCover", ordered=True, converter=_format_number),
+    "platform": QueryableProperty("platform"),
+    "sat:orbit_state": QueryableProperty("orbitDirection", converter=lambda v: str(v).upper()),
+    "sat:relative_orbit": QueryableProperty("relativeOrbitNumber", ordered=True, converter=_format_integer),
+    "product:type": QueryableProperty("productType"),
+    "grid:code": QueryableProperty("tileId", converter=lambda v: str(v)[len("MGRS-"):] if str(v).startswith("MGRS-") else str(v)),
+    "title": QueryableProperty("title"),
+    "created": QueryableProperty("publicationDate", ordered=True, converter=_format_datetime),
+    "updated": QueryableProperty("modificationDate", ordered=True, converter=_format_datetime),
+}
+
+# aliases of the comparison operators, as used by the different versions of the query extension
+_OPERATOR_ALIASES = {
+    "ne": "neq",
+    "le": "lte",
+    "ge": "gte",
+}
+_LOWER_BOUNDS = {"gt": "]", "gte": "["}
+_UPPER_BOUNDS = {"lt": "[", "lte": "]"}
+
+
+def _property_name(name: str) -> str:
+    return name[len("properties."):] if name.startswith("properties.") else name
+
+
+def queryable_property(name: str) -> Optional[QueryableProperty]:
+    """
+    Get the queryable definition of a STAC item property.
+
+    :param name: property name, optionally prefixed with `properties.`
+    :return: queryable property, or `None` if the backend cannot filter on the property
+    """
+    return QUERYABLE_PROPERTIES.get(_property_name(name))
+
+
+def predicate_value(prop: QueryableProperty, predicates: Dict[str, Any]) -> str:
+    """
+    Translates the comparisons on a single property to an OpenSearch parameter value.
+    Range comparisons are expressed using the interval notation of the OpenSearch EO extension, eg. `[10,20[`.
+
+    :param prop: queryable property
+    :param predicates: mapping of operator to value, eg. `{"gte": 10, "lt": 20}`
+    :return: OpenSearch parameter value
+    :raises ValueError: if the combination of comparisons cannot be expressed as a single parameter value, or if a
+        value does not match the type of the property
+    """
+    predicates = {_OPERATOR_ALIASES.get(op, op): value for op, value in predicates.items()}
+    unsupported = set(predicates) - {"eq", "in", *_LOWER_BOUNDS, *_UPPER_BOUNDS}
+    if len(unsupported) > 0:
+        raise ValueError(f"operator {', '.join(sorted(unsupported))} is not supported")
+    if len(predicates) == 0:
+        raise ValueError("no operator provided")
+
+    if "eq" in predicates or "in" in predicates:
+        if len(predicates) > 1:
+            raise ValueError("eq and in cannot be combined with other operators")
+        if "eq" in predicates:
+            return prop.converter(predicates["eq"])
+        values = predicates["in"]
+        if not isinstance(values, list) or len(values) == 0:
+            raise ValueError("in requires a non-empty list of values")
+        return "{" + ",".join(prop.converter(v) for v in values) + "}"
+
+    if not prop.ordered:
+        raise ValueError("range comparisons are not supported")
+    lower = [op for op in predicates if op in _LOWER_BOUNDS]
+    upper = [op for op in predicates if op in _UPPER_BOUNDS]
+    if len(lower) > 1 or len(upper) > 1:
+        raise ValueError("only a single lower and upper bound can be provided")
+
+    value = ""
+    if lower:
+        value += _LOWER_BOUNDS[lower[0]] + prop.converter(predicates[lower[0]])
+    if lower and upper:
+        value += ","
+    if upper:
+        value += prop.converter(predicates[upper[0]]) + _UPPER_BOUNDS[upper[0]]
+    return value
+
+
+def translate_query(query: Optional[Dict[str, Dict[str, Any]]]) -> dict:
+    """
+    Translates a STAC query extension filter to OpenSearch query parameters, so the filtering is done by the backend.
+
+    :param query: query extension filter, eg. `{"eo:cloud_cover": {"lt": 20}}`
+    :return: OpenSearch query parameters
+    :raises InvalidQueryParameter: if the filter contains properties or operators that are not supported
+    """
+    params = dict()
+    for name, predicates in (query or {}).items():
+        prop = queryable_property(name)
+        if prop is None:
+            raise InvalidQueryParameter(
+                f"Querying on {name} is not supported, supported properties: {', '.join(QUERYABLE_PROPERTIES)}."
+            )
+        if not isinstance(predicates, dict):
+            raise InvalidQueryParameter(f"Invalid query on {name}, expected a mapping of operator to value.")
+        try:
+            params[prop.parameter] = predicate_value(prop, predicates)
+        except ValueError as e:
+            raise InvalidQueryParameter(f"Invalid query on {name}: {e}.")
+    return params
@@ -0,0 +1,52 @@
+from typing import List, Optional, Dict
+
+from stac_pydantic.api.extensions.sort import SortExtension, SortDirections
+from stac_fastapi.types.errors import InvalidQueryParameter
+
+
+# STAC item properties that can be sorted on, mapped to the corresponding OpenSearch sort key
+SORTABLE_PROPERTIES: Dict[str, str] = {
+    "id": "identifier",
+    "datetime": "start",
+    "start_datetime": "start",
+    "end_datetime": "end",
+    "created": "published",
+    "updated": "updated",
+}
+
+
+def parse_sortby_param(value: str) -> Dict[str, str]:
+    """
+    Parse a `sortby` value of a GET request, eg. `-datetime` or `+id`.
+
+    :param value: field name, optionally prefixed with the sort direction
+    :return: sort definition as used in POST requests
+    """
+    # a leading '+' is decoded as a space in query parameters
+    value = value.strip()
+    if value.startswith("-"):
+        return {"field": value[1:], "direction": SortDirections.desc.value}
+    return {"field": value.lstrip("+"), "direction": SortDirections.asc.value}
+
+
+def sort_keys(sortby: Optional[List[SortExtension]]) -> str:
+    """
+    Translates the STAC sort definitions to the OpenSearch `sortKeys` parameter.
+
+    :param sortby: STAC sort definitions
+    :return: OpenSearch sort keys, empty if no sort order is requested
+    :raises InvalidQueryParameter: if sorting on one of the fields is not supported
+    """
+    if not sortby:
+        return ""
+
+    keys = []
+    for s in sortby:
+        field = s.field[len("properties."):] if s.field.startswith("properties.") else s.field
+        if field not in SORTABLE_PROPERTIES:
+            raise InvalidQueryParameter(
+                f"Sorting on {s.field} is not supported, supported fields: {', '.join(SORTABLE_PROPERTIES)}."
+            )
+        ascending = 1 if s.direction == SortDirections.asc else 0
+        keys.append(f"{SORTABLE_PROPERTIES[field]},,{ascending}")
+    return " ".join(keys)
@@ -24,6 +24,9 @@ setup(
         "asgi-logger",
         "jsonpath-ng"
     ],
+    extras_require={
+        "geoparquet": ["pyarrow>=7"]
+    },
     tests_require=[
         "pytest",
         "pytest-asyncio"
@@ -1,3 +1,4 @@
+import json
 from fastapi.testclient import TestClient
 from jsonpath_ng import jsonpath
 from jsonpath_ng.ext import parse
@@ -121,6 +122,30 @@ def test_get_search_no_collection(test_client: TestClient):
     assert response.status_code == 200
 
 
+def test_get_search_no_collection_paging(test_client: TestClient):
+    response = test_client.get(
+        "/search",
+        params={
+            "bbox": "4.3,51.1,4.5,51.3",
+            "datetime": "2020-02-01T00:00:00Z/2020-02-03T23:59:59Z",
+            "limit": 50
+        }
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data['features']) > 0
+
+    # the next pages continue the planned collections, which all have hits
+    path_links_next: jsonpath.JSONPath = parse("$.links[?(@.rel=='next')].href")
+    matches = path_links_next.find(data)
+    while len(matches) > 0:
+        response = test_client.get(matches[0].value)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data['features']) > 0
+        matches = path_links_next.find(data)
+
+
 def test_post_search(test_client: TestClient):
     page = 0
     response = test_client.post(
@@ -147,3 +172,197 @@ def test_post_search(test_client: TestClient):
         matches = path_links_next.find(data)
 
     assert page >= 1
+
+
+def test_bulk_items(test_client: TestClient):
+    item_ids = [
+        "urn:eop:VITO:TERRASCOPE_S2_CHL_V1:S2A_20220110T105421_31UES_CHL_20M_V120",
+        "non_existent_item",
+        "urn:eop:VITO:TERRASCOPE_S2_CHL_V1:S2A_20220110T105421_31UES_CHL_20M_V120",
+    ]
+    response = test_client.post(
+        "/collections/urn:eop:VITO:TERRASCOPE_S2_CHL_V1/bulk-items",
+        json={"ids": item_ids}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data['type'] == "FeatureCollection"
+    assert [item['id'] for item in data['features']] == [item_ids[0]]
+
+
+def test_bulk_items_invalid_collection(test_client: TestClient):
+    response = test_client.post(
+        "/collections/non_existent_collection/bulk-items",
+        json={"ids": ["non_existent_item"]}
+    )
+    assert response.status_code == 404
+
+
+def test_export(test_client: TestClient):
+    response = test_client.get(
+        "/collections/urn:eop:VITO:TERRASCOPE_S2_CHL_V1/export",
+        params={
+            "bbox": "4.0,51.0,4.5,51.5",
+            "datetime": "2020-02-01T00:00:00Z/2020-02-20T23:59:59Z"
+        }
+    )
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert len(lines) > 0
+    assert all(json.loads(line)['collection'] == "urn:eop:VITO:TERRASCOPE_S2_CHL_V1" for line in lines)
+
+
+def test_export_invalid_collection(test_client: TestClient):
+    response = test_client.get("/collections/non_existent_collection/export")
+    assert response.status_code == 404
+
+
+def test_get_search_sortby(test_client: TestClient):
+    response = test_client.get(
+        "/search",
+        params={
+            "collections": "urn:eop:VITO:TERRASCOPE_S2_CHL_V1",
+            "datetime": "2020-02-01T00:00:00Z/2020-02-20T23:59:59Z",
+            "sortby": "-datetime"
+        }
+    )
+    assert response.status_code == 200
+    data = response.json()
+    start_datetimes = [item['properties']['start_datetime'] for item in data['features']]
+    assert start_datetimes == sorted(start_datetimes, reverse=True)
+
+    # the sort order is preserved in the next link
+    path_links_next: jsonpath.JSONPath = parse("$.links[?(@.rel=='next')].href")
+    [next_link] = path_links_next.find(data)
+    response = test_client.get(next_link.value)
+    assert response.status_code == 200
+    next_start_datetimes = [item['properties']['start_datetime'] for item in response.json()['features']]
+    assert next_start_datetimes[0] <= start_datetimes[-1]
+
+
+def test_post_search_sortby_unsupported(test_client: TestClient):
+    response = test_client.post(
+        "/search",
+        json={
+            "collections": ["urn:eop:VITO:TERRASCOPE_S2_CHL_V1"],
+            "sortby": [{"field": "eo:cloud_cover", "direction": "asc"}]
+        }
+    )
+    assert response.status_code == 400
+
+
+def test_search_sortby_multiple_collections(test_client: TestClient):
+    # results are only sorted within a collection
+    response = test_client.post(
+        "/search",
+        json={
+            "collections": ["urn:eop:VITO:TERRASCOPE_S2_CHL_V1", "urn:eop:VITO:TERRASCOPE_S2_TUR_V1"],
+            "sortby": [{"field": "datetime", "direction": "desc"}]
+        }
+    )
+    assert response.status_code == 400
+    response = test_client.get("/search", params={"sortby": "-datetime"})
+    assert response.status_code == 400
+
+
+def test_post_search_query(test_client: TestClient):
+    response = test_client.post(
+        "/search",
+        json={
+            "collections": ["urn:eop:VITO:TERRASCOPE_S2_CHL_V1"],
+            "datetime": "2020-02-01T00:00:00Z/2020-02-20T23:59:59Z",
+            "query": {"eo:cloud_cover": {"lt": 20}}
+        }
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data['features']) > 0
+    assert all(item['properties']['eo:cloud_cover'] < 20 for item in data['features'])
+
+
+def test_get_search_query_unsupported(test_client: TestClient):
+    response = test_client.get(
+        "/search",
+        params={
+            "collections": "urn:eop:VITO:TERRASCOPE_S2_CHL_V1",
+            "query": json.dumps({"eo:cloud_cover": {"startsWith": "1"}})
+        }
+    )
+    assert response.status_code == 400
+    response = test_client.get(
+        "/search",
+        params={
+            "collections": "urn:eop:VITO:TERRASCOPE_S2_CHL_V1",
+            "query": json.dumps({"non_existent_property": {"eq": 1}})
+        }
+    )
+    assert response.status_code == 400
+    response = test_client.get(
+        "/search",
+        params={
+            "collections": "urn:eop:VITO:TERRASCOPE_S2_CHL_V1",
+            "query": json.dumps({"eo:cloud_cover": {"lt": "abc"}})
+        }
+    )
+    assert response.status_code == 400
+
+
+def test_get_search_filter(test_client: TestClient):
+    response = test_client.get(
+        "/search",
+        params={
+            "collections": "urn:eop:VITO:TERRASCOPE_S2_CHL_V1",
+            "datetime": "2020-02-01T00:00:00Z/2020-02-20T23:59:59Z",
+            "filter": "eo:cloud_cover < 50 AND title LIKE '%31UES%'",
+            "limit": 5
+        }
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data['features']) > 0
+    assert all('31UES' in item['properties']['title'] for item in data['features'])
+
+
+def test_post_search_filter_invalid(test_client: TestClient):
+    response = test_client.post(
+        "/search",
+        json={
+            "collections": ["urn:eop:VITO:TERRASCOPE_S2_CHL_V1"],
+            "filter": {"op": "a_contains", "args": [{"property": "instruments"}, ["msi"]]},
+            "filter-lang": "cql2-json"
+        }
+    )
+    assert response.status_code == 400
+    response = test_client.post(
+        "/search",
+        json={
+            "collections": ["urn:eop:VITO:TERRASCOPE_S2_CHL_V1"],
+            "filter": {"op": "and"},
+            "filter-lang": "cql2-json"
+        }
+    )
+    assert response.status_code == 400
+
+
+def test_queryables(test_client: TestClient):
+    response = test_client.get("/queryables")
+    assert response.status_code == 200
+    assert "eo:cloud_cover" in response.json()['properties']
+
+
+def test_metrics(test_client: TestClient):
+    response = test_client.get(
+        "/search",
+        params={
+            "collections": "urn:eop:VITO:TERRASCOPE_S2_CHL_V1",
+            "limit": 5
+        }
+    )
+    assert response.status_code == 200
+
+    response = test_client.get("/metrics")
+    assert response.status_code == 200
+    data = response.json()
+    assert data['client_pages'] >= 1
+    assert data['backend_requests'] >= 1
+    assert data['buffer']['size'] <= data['buffer']['memory_budget']
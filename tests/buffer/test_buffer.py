@@ -0,0 +1,130 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from opensearch_stac_adapter.buffer import ProductBuffer
+
+
+class FakeBackend:
+    """Backend with a fixed number of products, recording the requested ranges."""
+
+    def __init__(self, product_count):
+        self.product_count = product_count
+        self.requests = []
+
+    def fetch(self, start_index, count):
+        self.requests.append((start_index, count))
+        end_index = min(start_index + count, self.product_count + 1)
+        return [SimpleNamespace(id=i, geojson={"id": i}) for i in range(start_index, end_index)]
+
+
+@pytest.mark.asyncio
+async def test_read_buffered():
+    backend = FakeBackend(1000)
+    buffer = ProductBuffer(min_page_size=20, max_page_size=100)
+    cursor = buffer.cursor("collection", {"start": "2020-01-01"})
+
+    start_index = 1
+    for _ in range(10):
+        products = await buffer.read(cursor, start_index, 5, 1000 - start_index + 1, backend.fetch)
+        assert [p.id for p in products] == list(range(start_index, start_index + 5))
+        start_index += 5
+        buffer.metrics.client_pages += 1
+
+    # the fetch size grows on every continuation of the cursor
+    assert backend.requests == [(1, 20), (21, 40)]
+    assert buffer.metrics.backend_requests_per_page == 0.2
+
+    # only the segment at which the cursor continues is buffered
+    for _ in range(50):
+        await buffer.read(cursor, start_index, 5, 1000 - start_index + 1, backend.fetch)
+        start_index += 5
+    assert len(buffer._segments) == 1
+    assert buffer.buffered_products == 40
+
+
+@pytest.mark.asyncio
+async def test_read_split():
+    backend = FakeBackend(250)
+    buffer = ProductBuffer(max_page_size=100)
+    cursor = buffer.cursor("collection", {})
+
+    products = await buffer.read(cursor, 1, 300, 250, backend.fetch)
+
+    assert [p.id for p in products] == list(range(1, 251))
+    assert sorted(backend.requests) == [(1, 100), (101, 100), (201, 50)]
+
+
+@pytest.mark.asyncio
+async def test_memory_budget():
+    backend = FakeBackend(1000)
+    buffer = ProductBuffer(min_page_size=100, memory_budget=1000)
+
+    await buffer.read(buffer.cursor("a", {}), 1, 10, 1000, backend.fetch)
+    await buffer.read(buffer.cursor("b", {}), 1, 1, 1000, backend.fetch)
+
+    assert buffer.size <= 1000
+    assert buffer.metrics.evicted_products > 0
+
+
+@pytest.mark.asyncio
+async def test_unread():
+    backend = FakeBackend(1000)
+    buffer = ProductBuffer(min_page_size=50)
+    cursor = buffer.cursor("collection", {})
+
+    products = await buffer.read(cursor, 1, 10, 1000, backend.fetch)
+    buffer.unread(cursor, 6, products[5:])
+    products = await buffer.read(cursor, 6, 10, 995, backend.fetch)
+
+    assert [p.id for p in products] == list(range(6, 16))
+    assert len(backend.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_read_interleaved():
+    backend = FakeBackend(1000)
+    buffer = ProductBuffer(min_page_size=20, max_page_size=100)
+    cursor = buffer.cursor("collection", {})
+
+    # two clients paging the same search at different offsets keep their own segments
+    for start_index in range(1, 51, 5):
+        for offset in (0, 500):
+            products = await buffer.read(cursor, start_index + offset, 5, 1000 - start_index - offset + 1, backend.fetch)
+            assert [p.id for p in products] == list(range(start_index + offset, start_index + offset + 5))
+
+    assert backend.requests == [(1, 20), (501, 20), (21, 40), (521, 40)]
+
+    # a read at another index starts over with the minimum page size
+    await buffer.read(cursor, 801, 5, 200, backend.fetch)
+    assert backend.requests[-1] == (801, 20)
+
+
+@pytest.mark.asyncio
+async def test_read_exhausted():
+    backend = FakeBackend(10)
+    buffer = ProductBuffer(min_page_size=20)
+    cursor = buffer.cursor("collection", {})
+
+    # the hit count is outdated, the cursor is exhausted after 10 products
+    products = await buffer.read(cursor, 1, 15, 15, backend.fetch)
+
+    assert len(products) == 10
+    assert [(key[1], len(segment.products)) for key, segment in buffer._segments.items()] == [(11, 0)]
+
+
+@pytest.mark.asyncio
+async def test_max_age():
+    backend = FakeBackend(1000)
+    buffer = ProductBuffer(min_page_size=20, max_age=0.05)
+    cursor = buffer.cursor("collection", {})
+
+    await buffer.read(cursor, 1, 5, 1000, backend.fetch)
+    time.sleep(0.1)
+    products = await buffer.read(cursor, 6, 5, 995, backend.fetch)
+
+    # stale products are dropped and fetched again
+    assert [p.id for p in products] == list(range(6, 11))
+    assert backend.requests == [(1, 20), (6, 20)]
+    assert buffer.metrics.evicted_products == 15
@@ -4,8 +4,11 @@ from stac_fastapi.api.app import ApiSettings
 from stac_fastapi.api.app import StacApi
 from fastapi.testclient import TestClient
 
-from opensearch_stac_adapter.adapter import OpenSearchAdapterClient
-from opensearch_stac_adapter.models.search import AdaptedSearch
+from stac_fastapi.extensions.core import SortExtension, QueryExtension, FilterExtension
+from opensearch_stac_adapter.adapter import OpenSearchAdapterClient, OpenSearchFiltersClient
+from opensearch_stac_adapter.models.search import AdaptedSearch, AdaptedSearchGetRequest
+from opensearch_stac_adapter.extensions import BulkItemsExtension, ExportExtension, MetricsExtension
+from opensearch_stac_adapter.cql2 import FILTER_CONFORMANCE_CLASSES
 
 settings = ApiSettings()
 
@@ -17,13 +20,22 @@ def opensearch_adapter_client() -> OpenSearchAdapterClient:
 
 @pytest.fixture(scope="session")
 def api_client() -> StacApi:
-    extensions = []
+    client = OpenSearchAdapterClient()
+    extensions = [
+        BulkItemsExtension(client=client),
+        ExportExtension(client=client),
+        MetricsExtension(client=client),
+        SortExtension(),
+        QueryExtension(),
+        FilterExtension(client=OpenSearchFiltersClient(), conformance_classes=FILTER_CONFORMANCE_CLASSES)
+    ]
 
     api = StacApi(
         settings=settings,
         extensions=extensions,
-        client=OpenSearchAdapterClient(),
+        client=client,
         search_request_model=AdaptedSearch,
+        search_get_request=AdaptedSearchGetRequest,
     )
 
     return api
@@ -0,0 +1,84 @@
+import pytest
+
+from opensearch_stac_adapter.cql2 import parse_filter, split_filter, compile_filter
+
+item = {
+    "type": "Feature",
+    "id": "urn:eop:VITO:TERRASCOPE_S2_CHL_V1:S2A_20200205T104431_31UES_CHL_20M_V120",
+    "collection": "urn:eop:VITO:TERRASCOPE_S2_CHL_V1",
+    "geometry": {"type": "Point", "coordinates": [4.5, 51.5]},
+    "properties": {
+        "datetime": "2020-02-05T10:44:31.024Z",
+        "start_datetime": "2020-02-05T10:44:31.024Z",
+        "end_datetime": "2020-02-05T10:44:31.024Z",
+        "title": "S2A_20200205T104431_31UES_CHL_20M_V120",
+        "platform": "S2A",
+        "eo:cloud_cover": 12.5,
+    }
+}
+
+
+def test_parse_text():
+    cql2_filter = parse_filter("eo:cloud_cover < 20 AND S_INTERSECTS(geometry, BBOX(4, 51, 5, 52))")
+    assert cql2_filter == {
+        "op": "and",
+        "args": [
+            {"op": "<", "args": [{"property": "eo:cloud_cover"}, 20]},
+            {"op": "s_intersects", "args": [{"property": "geometry"}, {"bbox": [4, 51, 5, 52]}]},
+        ]
+    }
+
+
+def test_parse_invalid():
+    with pytest.raises(ValueError):
+        parse_filter("eo:cloud_cover <")
+    with pytest.raises(ValueError):
+        parse_filter("eo:cloud_cover < 20", "cql-text")
+    with pytest.raises(ValueError):
+        parse_filter({"op": "and"}, "cql2-json")
+    with pytest.raises(ValueError):
+        parse_filter({"op": "=", "args": [{"property": 5}, 1]}, "cql2-json")
+    with pytest.raises(ValueError):
+        parse_filter({"op": "t_before", "args": [{"property": "datetime"}, {"interval": 5}]}, "cql2-json")
+    with pytest.raises(ValueError):
+        parse_filter({"op": "s_intersects", "args": [{"property": "geometry"}, {"bbox": 5}]}, "cql2-json")
+    with pytest.raises(ValueError):
+        parse_filter({"op": "t_after", "args": [{"property": "datetime"}, {"timestamp": 5}]}, "cql2-json")
+
+
+def test_split_filter():
+    cql2_filter = parse_filter(
+        "eo:cloud_cover BETWEEN 10 AND 20 AND title LIKE 'S2A%' "
+        "AND T_INTERSECTS(datetime, INTERVAL('2020-02-01', '2020-02-10'))"
+    )
+    params, residual = split_filter(cql2_filter, {})
+    assert params == {"cloudCover": "[10,20]", "start": "2020-02-01", "end": "2020-02-10"}
+    assert residual == {"op": "like", "args": [{"property": "title"}, "S2A%"]}
+
+    # parameters of the search request itself are not overridden
+    params, residual = split_filter(cql2_filter, {"start": "2020-01-01"})
+    assert "start" not in params
+    assert residual["op"] == "and"
+
+    # timestamps and bboxes are validated, timestamps are only pushed down for temporal properties
+    with pytest.raises(ValueError):
+        split_filter(parse_filter("T_INTERSECTS(datetime, INTERVAL('2020-01-01', 'garbage'))"), {})
+    with pytest.raises(ValueError):
+        split_filter(parse_filter("created < TIMESTAMP('nope')"), {})
+    with pytest.raises(ValueError):
+        split_filter(parse_filter("S_INTERSECTS(geometry, BBOX('a', 'b', 'c', 'd'))"), {})
+    with pytest.raises(ValueError):
+        split_filter(parse_filter("S_INTERSECTS(geometry, BBOX(5, 51, 4, 52))"), {})
+    params, residual = split_filter(parse_filter("id = TIMESTAMP('2020-01-01T00:00:00Z')"), {})
+    assert params == {}
+    assert residual is not None
+
+
+def test_compile_filter():
+    assert compile_filter(parse_filter("title LIKE 'S2A%' AND platform IN ('S2A', 'S2B')"))(item)
+    assert compile_filter(parse_filter("eo:cloud_cover < 10 OR S_WITHIN(geometry, BBOX(4, 51, 5, 52))"))(item)
+    assert compile_filter(parse_filter("datetime > TIMESTAMP('2020-02-05T10:00:00Z')"))(item)
+    assert not compile_filter(parse_filter("T_BEFORE(datetime, DATE('2020-02-01'))"))(item)
+    # comparisons on missing properties are unknown, and do not match even when negated
+    assert not compile_filter(parse_filter("NOT (missing > 3)"))(item)
+    assert compile_filter(parse_filter("missing IS NULL"))(item)
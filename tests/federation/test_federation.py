@@ -0,0 +1,133 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from opensearch_stac_adapter.federation import BackendUnavailableError, CatalogueBackend, FederatedCatalogue
+
+
+class FakeCatalogue:
+    """In-memory catalogue with a configurable response delay."""
+
+    def __init__(self, collections, delay=0.0):
+        self.collections = collections
+        self.delay = delay
+        self.requests = []
+
+    def get_collections(self, **kwargs):
+        self.requests.append(("get_collections", kwargs))
+        time.sleep(self.delay)
+        uid = kwargs.get("uid")
+        return iter([SimpleNamespace(id=c, source=self) for c in self.collections if uid is None or c == uid])
+
+    def get_products(self, collection, **kwargs):
+        self.requests.append(("get_products", collection))
+        return iter([])
+
+    def get_product_count(self, collection, **kwargs):
+        self.requests.append(("get_product_count", collection))
+        return 0
+
+
+def test_get_collections_merges_backends():
+    primary = FakeCatalogue(["a", "b"])
+    mirror = FakeCatalogue(["b", "c"])
+    catalogue = FederatedCatalogue(
+        backends=[CatalogueBackend("primary", primary), CatalogueBackend("mirror", mirror)],
+        routes={"b": "mirror"}
+    )
+
+    collections = list(catalogue.get_collections())
+
+    assert [c.id for c in collections] == ["a", "b", "c"]
+    assert [c.source for c in collections] == [primary, mirror, mirror]
+
+
+def test_get_collections_timeout():
+    catalogue = FederatedCatalogue(backends=[
+        CatalogueBackend("fast", FakeCatalogue(["a"]), timeout=1.0),
+        CatalogueBackend("slow", FakeCatalogue(["b"], delay=2.0), timeout=0.1),
+    ])
+
+    started = time.monotonic()
+    collections = list(catalogue.get_collections())
+
+    assert time.monotonic() - started < 1.0
+    assert [c.id for c in collections] == ["a"]
+
+
+def test_get_collections_last_listing():
+    flaky = FakeCatalogue(["b"])
+    catalogue = FederatedCatalogue(backends=[
+        CatalogueBackend("primary", FakeCatalogue(["a"])),
+        CatalogueBackend("flaky", flaky, timeout=0.1),
+    ])
+    assert [c.id for c in catalogue.get_collections()] == ["a", "b"]
+
+    # a backend that does not respond keeps its last listing, so the list of all collections does not change
+    flaky.delay = 1.0
+    assert [c.id for c in catalogue.get_collections()] == ["a", "b"]
+
+
+def test_get_collections_hanging_backend():
+    catalogue = FederatedCatalogue(backends=[
+        CatalogueBackend("fast", FakeCatalogue(["a"]), timeout=1.0),
+        CatalogueBackend("slow", FakeCatalogue(["b"], delay=2.0), timeout=0.1, max_concurrent_requests=2),
+    ])
+
+    # requests to the hanging backend pile up, but never hold up the requests to the other backend
+    for _ in range(12):
+        started = time.monotonic()
+        assert [c.id for c in catalogue.get_collections()] == ["a"]
+        assert time.monotonic() - started < 0.5
+
+
+def test_routed_timeout():
+    slow = FakeCatalogue(["b"])
+    catalogue = FederatedCatalogue(backends=[
+        CatalogueBackend("fast", FakeCatalogue(["a"])),
+        CatalogueBackend("slow", slow, timeout=0.1),
+    ])
+    list(catalogue.get_collections())
+    slow.get_product_count = lambda collection, **kwargs: time.sleep(2.0)
+
+    started = time.monotonic()
+    with pytest.raises(BackendUnavailableError):
+        catalogue.get_product_count("b")
+    assert time.monotonic() - started < 1.0
+
+
+def test_routed_busy_backend():
+    busy = FakeCatalogue(["b"])
+    catalogue = FederatedCatalogue(backends=[
+        CatalogueBackend("fast", FakeCatalogue(["a"])),
+        CatalogueBackend("busy", busy, timeout=5.0, max_concurrent_requests=4),
+    ])
+    list(catalogue.get_collections())
+    busy.get_product_count = lambda collection, **kwargs: time.sleep(0.2) or 1
+
+    # routed requests beyond the requests in flight wait for a slot instead of failing
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        counts = list(executor.map(lambda _: catalogue.get_product_count("b"), range(12)))
+    assert counts == [1] * 12
+
+
+def test_routing():
+    primary = FakeCatalogue(["a"])
+    mirror = FakeCatalogue(["b"])
+    catalogue = FederatedCatalogue(backends=[CatalogueBackend("primary", primary), CatalogueBackend("mirror", mirror)])
+
+    assert catalogue.get_product_count("b") == 0
+    list(catalogue.get_products("b"))
+    list(catalogue.get_collections(uid="b"))
+
+    # the collection is discovered once, after which the requests are only sent to the owning backend
+    assert ("get_products", "b") in mirror.requests
+    assert all(request[0] == "get_collections" for request in primary.requests)
+    assert len(primary.requests) == 1
+
+
+def test_invalid_routes():
+    with pytest.raises(ValueError):
+        FederatedCatalogue(backends=[CatalogueBackend("primary", FakeCatalogue([]))], routes={"a": "unknown"})
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from opensearch_stac_adapter.adapter import OpenSearchAdapterClient
+from opensearch_stac_adapter.planning import extent_intersects
+
+extent = {
+    "spatial": {
+        "bbox": [[2.5, 49.5, 6.4, 51.5]]
+    },
+    "temporal": {
+        "interval": [["2018-01-01", "2020-12-31"]]
+    }
+}
+
+
+def test_extent_intersects_spatial():
+    assert extent_intersects(extent, {"bbox": [4.0, 50.0, 5.0, 51.0]})
+    assert not extent_intersects(extent, {"bbox": [10.0, 50.0, 11.0, 51.0]})
+    assert extent_intersects(extent, {"geometry": "POINT (4.4 51.2)"})
+    assert not extent_intersects(extent, {"geometry": "POINT (-4.4 51.2)"})
+
+
+def test_extent_intersects_temporal():
+    assert extent_intersects(extent, {"start": "2019-06-01T00:00:00Z", "end": "2019-07-01T00:00:00Z"})
+    # date bounds of the extent cover the whole day
+    assert extent_intersects(extent, {"start": "2020-12-31T12:00:00Z"})
+    assert not extent_intersects(extent, {"start": "2021-06-01T00:00:00Z"})
+    assert not extent_intersects(extent, {"end": "2017-06-01T00:00:00Z"})
+
+
+def test_extent_intersects_unknown():
+    open_extent = {"spatial": {"bbox": [None]}, "temporal": {"interval": [["2018-01-01", None]]}}
+    assert extent_intersects(open_extent, {"bbox": [10.0, 50.0, 11.0, 51.0], "start": "2030-01-01T00:00:00Z"})
+    assert extent_intersects(None, {"bbox": [10.0, 50.0, 11.0, 51.0]})
+
+
+class FakeCatalogue:
+    """Catalogue of collections with a fixed hit count, of which the count of `failing` collections fails."""
+
+    def __init__(self, collection_count, failing=(), error=requests.ConnectionError):
+        self.collection_count = collection_count
+        self.failing = failing
+        self.error = error
+
+    def get_collections(self, **kwargs):
+        return iter([
+            SimpleNamespace(
+                id=f"urn:eop:VITO:TERRASCOPE_COLLECTION_{i}_V1",
+                bbox=[2.5, 49.5, 6.4, 51.5],
+                properties={"date": "2018-01-01/"}
+            )
+            for i in range(self.collection_count)
+        ])
+
+    def get_product_count(self, collection, **kwargs):
+        if collection in self.failing:
+            raise self.error("backend unavailable")
+        return 10
+
+
+@pytest.mark.asyncio
+async def test_plan_search():
+    catalogue = FakeCatalogue(100, failing=["urn:eop:VITO:TERRASCOPE_COLLECTION_0_V1"])
+    client = OpenSearchAdapterClient(catalogue=catalogue)
+
+    extents = await client._collection_extents()
+    position = await client._plan_search(extents, {"bbox": [4.0, 50.0, 5.0, 51.0]}, "")
+
+    # the collection that cannot be counted is left out
+    assert position.collection == "urn:eop:VITO:TERRASCOPE_COLLECTION_1_V1"
+    assert len(position.plan) == 98
+    assert len(str(position)) < 2048
+
+    # the plan refers to the collections that were loaded for the request, even if the cache is refreshed meanwhile
+    catalogue.collection_count = 0
+    client.collection_cache_ttl = 0
+    position = await client._next_position(position, list(extents), {})
+    assert position.collection == "urn:eop:VITO:TERRASCOPE_COLLECTION_2_V1"
+    assert position.hit_count == 10
+
+
+@pytest.mark.asyncio
+async def test_plan_search_error():
+    catalogue = FakeCatalogue(10, failing=["urn:eop:VITO:TERRASCOPE_COLLECTION_0_V1"], error=RuntimeError)
+    client = OpenSearchAdapterClient(catalogue=catalogue)
+
+    # only an unavailable backend is skipped, other errors fail the search
+    with pytest.raises(RuntimeError):
+        await client._plan_search(await client._collection_extents(), {"bbox": [4.0, 50.0, 5.0, 51.0]}, "")